@@ -2,7 +2,8 @@
 Router agent selects a database and emits a coarse plan.
 """
 
-from typing import Any, Dict, List
+from collections import Counter
+from typing import Any, Dict, FrozenSet, List, Optional
 
 from src.infra.llm import LLMClient
 
@@ -14,11 +15,16 @@ class RouterAgent:
 
     name = "router"
 
-    def __init__(self, llm: LLMClient):
+    def __init__(self, llm: LLMClient, index_threshold: int = 50):
         """
         Create a RouterAgent with an LLM client.
+        Catalogs with at least index_threshold dbs are scored through an inverted token index.
         """
         self.llm = llm
+        self.index_threshold = index_threshold
+        self._desc_tokens: Dict[str, FrozenSet[str]] = {}
+        self._indexed_catalog: Optional[Dict[str, Dict[str, Any]]] = None
+        self._token_index: Dict[str, List[str]] = {}
 
     def route(self, user_query: str, db_catalog: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -40,15 +46,43 @@ class RouterAgent:
         if not candidates:
             return ""
         # Simple heuristic: pick the db whose description shares the most keywords; fall back to first.
-        lower_query = user_query.lower()
-        scores = []
-        for db_id in candidates:
-            desc = db_catalog.get(db_id, {}).get("short_desc", "").lower()
-            overlap = sum(1 for token in lower_query.split() if token in desc)
-            scores.append((overlap, db_id))
-        scores.sort(reverse=True)
-        best = scores[0][1]
-        return best
+        query_tokens = frozenset(user_query.lower().split())
+        if len(candidates) >= self.index_threshold:
+            return self._select_db_indexed(query_tokens, db_catalog, candidates)
+        return max(
+            candidates,
+            key=lambda db_id: (len(query_tokens & self._tokens_for(db_catalog.get(db_id, {}))), db_id),
+        )
+
+    def _select_db_indexed(self, query_tokens: FrozenSet[str], db_catalog: Dict[str, Dict[str, Any]], candidates: List[str]) -> str:
+        """
+        Score only the dbs sharing a token with the query, via an inverted index built once per catalog.
+        The index is reused while the same catalog object is passed in; catalogs are treated as immutable.
+        """
+        if db_catalog is not self._indexed_catalog:
+            index: Dict[str, List[str]] = {}
+            for db_id in candidates:
+                for token in self._tokens_for(db_catalog.get(db_id, {})):
+                    index.setdefault(token, []).append(db_id)
+            self._token_index = index
+            self._indexed_catalog = db_catalog
+        hits: Counter = Counter()
+        for token in query_tokens:
+            hits.update(self._token_index.get(token, ()))
+        if not hits:
+            return max(candidates)
+        return max(hits, key=lambda db_id: (hits[db_id], db_id))
+
+    def _tokens_for(self, db_meta: Dict[str, Any]) -> FrozenSet[str]:
+        """
+        Return the lowercase token set of a db description, memoized per description text.
+        """
+        desc = db_meta.get("short_desc", "")
+        tokens = self._desc_tokens.get(desc)
+        if tokens is None:
+            tokens = frozenset(desc.lower().split())
+            self._desc_tokens[desc] = tokens
+        return tokens
 
     def _draft_plan(self, user_query: str, db_meta: Dict[str, Any]) -> Dict[str, Any]:
         """
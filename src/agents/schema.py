@@ -2,6 +2,7 @@
 Schema agent implementing an AutoLink-style iterative schema linking loop.
 """
 
+from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Set, Tuple
 import json
@@ -12,7 +13,7 @@ from src.infra.vector_store import SchemaVectorStoreService, ColumnSnippet
 from src.infra.db import DBIntrospectionService, ProbeResult
 
 
-@dataclass
+@dataclass(slots=True)
 class SchemaAgentConfig:
     """
     Tunable parameters for the schema agent.
@@ -27,7 +28,7 @@ class SchemaAgentConfig:
     enable_explore_schema: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class TableSchema:
     """
     Compact table schema representation.
@@ -35,9 +36,16 @@ class TableSchema:
 
     table: str
     columns: List[ColumnSnippet] = field(default_factory=list)
+    column_ids: Set[str] = field(default_factory=set, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """
+        Index the initial column ids for O(1) membership checks on merge.
+        """
+        self.column_ids = {c.id for c in self.columns}
 
 
-@dataclass
+@dataclass(slots=True)
 class TraceStep:
     """
     Single step record capturing LLM actions and tool observations.
@@ -47,9 +55,10 @@ class TraceStep:
     llm_actions: List[Dict[str, Any]]
     observations: List[Dict[str, Any]]
     forced_stop: bool = False
+    rendered: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class SchemaAgentState:
     """
     Working state for the schema agent across iterations.
@@ -63,17 +72,21 @@ class SchemaAgentState:
     retrieve_cache: Dict[str, List[ColumnSnippet]]
     trace: List[TraceStep]
     step: int = 0
+    serialized_schema: Dict[str, Any] = field(default_factory=dict)
+    cache_index: Dict[str, ColumnSnippet] = field(default_factory=dict)
+    retrieve_memo: Dict[Tuple[str, int, int], List[ColumnSnippet]] = field(default_factory=dict)
+    probe_memo: Dict[str, ProbeResult] = field(default_factory=dict)
+    table_summary_cache: Dict[str, str] = field(default_factory=dict)
 
 
 def build_schema_from_columns(columns: List[ColumnSnippet]) -> Dict[str, TableSchema]:
     """
     Group column snippets into a table→TableSchema mapping.
     """
-    tables: Dict[str, TableSchema] = {}
+    groups: Dict[str, List[ColumnSnippet]] = defaultdict(list)
     for col in columns:
-        table_schema = tables.setdefault(col.table, TableSchema(table=col.table))
-        table_schema.columns.append(col)
-    return tables
+        groups[col.table].append(col)
+    return {table: TableSchema(table=table, columns=cols) for table, cols in groups.items()}
 
 
 class SchemaAgent:
@@ -112,9 +125,13 @@ class SchemaAgent:
             retrieve_cache={},
             trace=[],
         )
+        # The serialized schema and trace live in the context and are updated incrementally.
+        state.serialized_schema = self._serialize_linked_schema(state.linked_schema)
+        state.table_summary_cache = {table: self._summarize_table(schema) for table, schema in state.linked_schema.items()}
         ctx.schema_state = {
             "table_list": table_list,
-            "linked_schema": self._serialize_linked_schema(state.linked_schema),
+            "linked_schema": state.serialized_schema,
+            "linking_trace": [],
         }
 
         while state.step < self.config.max_steps:
@@ -122,8 +139,13 @@ class SchemaAgent:
             actions = self._call_llm(prompt)
             observations: List[Dict[str, Any]] = []
 
+            # Actions after a stop_action are never executed; the step ends the loop.
+            stop_at = next((i for i, a in enumerate(actions) if a.get("type") == "stop_action"), None)
+            runnable = actions if stop_at is None else actions[: stop_at + 1]
+
+            self._prefetch_retrievals(runnable, state)
             feedback_actions = 0
-            for action in actions:
+            for action in runnable:
                 obs = self._dispatch_action(action, state)
                 if obs is not None:
                     observations.append(obs)
@@ -133,17 +155,20 @@ class SchemaAgent:
             if feedback_actions < self.config.min_feedback_actions_per_step:
                 observations.append({"warning": "no_feedback_action", "detail": "Add retrieve_schema/explore_schema/verify_schema"})
 
-            state.trace.append(TraceStep(step=state.step, llm_actions=actions, observations=observations))
-            ctx.schema_state["linking_trace"] = self._serialize_trace(state.trace)
-            ctx.schema_state["linked_schema"] = self._serialize_linked_schema(state.linked_schema)
+            trace_step = TraceStep(step=state.step, llm_actions=actions, observations=observations)
+            state.trace.append(trace_step)
+            ctx.schema_state["linking_trace"].append(self._serialize_step(trace_step))
 
-            if any(action["type"] == "stop_action" for action in actions):
+            if stop_at is not None:
                 break
 
+            # Only steps that feed a later prompt need the rendered form.
+            trace_step.rendered = self._render_step(trace_step)
             state.step += 1
 
         if state.step >= self.config.max_steps and state.trace:
             state.trace[-1].forced_stop = True  # mark last step
+            ctx.schema_state["linking_trace"][-1]["forced_stop"] = True
         return ctx
 
     def _dispatch_action(self, action: Dict[str, Any], state: SchemaAgentState) -> Optional[Dict[str, Any]]:
@@ -154,29 +179,33 @@ class SchemaAgent:
         if action_type == "retrieve_schema":
             query = action.get("query", state.user_query)
             top_k = int(action.get("top_k", self.config.retrieve_top_k))
-            cols = self.vector_store.search_columns(
-                db_id=state.db_id,
-                query=query,
-                exclude_cols=list(state.seen_columns),
-                top_k=top_k,
-            )
-            cache_key = f"step-{state.step}-{len(state.retrieve_cache)}"
-            state.retrieve_cache[cache_key] = cols
+            memo_key = self._retrieve_key(query, top_k, state)
+            cols = state.retrieve_memo.get(memo_key)
+            if cols is None:
+                cols = self.vector_store.search_columns(
+                    db_id=state.db_id,
+                    query=query,
+                    exclude_cols=state.seen_columns,
+                    top_k=top_k,
+                )
+                self._cache_retrieval(memo_key, cols, state)
             return {"action": "retrieve_schema", "query": query, "returned": [c.id for c in cols]}
 
         if action_type == "explore_schema" and self.config.enable_explore_schema:
-            sql = action.get("sql", "")
-            probe = self.db_service.exec_probe(db_id=state.db_id, sql=sql)
+            probe = self._probe(action.get("sql", ""), state)
             return {"action": "explore_schema", "status": probe.status, "summary": probe.summary}
 
         if action_type == "verify_schema" and self.config.enable_verify_schema:
-            sql = action.get("sql", "")
-            probe = self.db_service.exec_probe(db_id=state.db_id, sql=sql)
+            probe = self._probe(action.get("sql", ""), state)
             return {"action": "verify_schema", "status": probe.status, "error": probe.error_type, "message": probe.error_message_short}
 
         if action_type == "add_schema":
             cols_to_add = self._resolve_columns(action.get("columns", []), state)
-            state.linked_schema = self._merge_schema(state.linked_schema, cols_to_add)
+            added = self._merge_schema(state.linked_schema, cols_to_add)
+            for col in added:
+                state.serialized_schema.setdefault(col.table, {"columns": []})["columns"].append(self._serialize_column(col))
+            for table in {col.table for col in added}:
+                state.table_summary_cache[table] = self._summarize_table(state.linked_schema[table])
             for col in cols_to_add:
                 state.seen_columns.add(col.id)
             return {"action": "add_schema", "added": [c.id for c in cols_to_add]}
@@ -186,44 +215,99 @@ class SchemaAgent:
 
         return {"action": "unknown", "detail": action}
 
+    def _prefetch_retrievals(self, actions: List[Dict[str, Any]], state: SchemaAgentState) -> None:
+        """
+        Batch the retrieve_schema actions that precede the first add_schema into one store call per top_k.
+        Results land in the retrieve memo so the regular dispatch picks them up in order.
+        """
+        pending: Dict[int, List[str]] = {}
+        for action in actions:
+            action_type = action.get("type")
+            if action_type == "add_schema":
+                break  # later retrievals see a different exclusion set
+            if action_type != "retrieve_schema":
+                continue
+            query = action.get("query", state.user_query)
+            top_k = int(action.get("top_k", self.config.retrieve_top_k))
+            queries = pending.setdefault(top_k, [])
+            if self._retrieve_key(query, top_k, state) not in state.retrieve_memo and query not in queries:
+                queries.append(query)
+
+        for top_k, queries in pending.items():
+            if len(queries) < 2:
+                continue
+            results = self.vector_store.search_columns_batch(
+                db_id=state.db_id,
+                queries=queries,
+                exclude_cols=state.seen_columns,
+                top_k=top_k,
+            )
+            for query, cols in zip(queries, results):
+                self._cache_retrieval(self._retrieve_key(query, top_k, state), cols, state)
+
+    def _retrieve_key(self, query: str, top_k: int, state: SchemaAgentState) -> Tuple[str, int, int]:
+        """
+        Memo key for a retrieval; seen_columns only grows during a run, so its size identifies the exclusion set.
+        """
+        return (query, top_k, len(state.seen_columns))
+
+    def _cache_retrieval(self, memo_key: Tuple[str, int, int], cols: List[ColumnSnippet], state: SchemaAgentState) -> None:
+        """
+        Record retrieved columns in the memo, the retrieve cache, and the column index.
+        """
+        state.retrieve_memo[memo_key] = cols
+        cache_key = f"step-{state.step}-{len(state.retrieve_cache)}"
+        state.retrieve_cache[cache_key] = cols
+        state.cache_index.update({c.id: c for c in cols})
+
+    def _probe(self, sql: str, state: SchemaAgentState) -> ProbeResult:
+        """
+        Execute a probe SQL once per run, reusing the result for repeated statements.
+        """
+        key = sql.strip()
+        probe = state.probe_memo.get(key)
+        if probe is None:
+            probe = self.db_service.exec_probe(db_id=state.db_id, sql=sql)
+            state.probe_memo[key] = probe
+        return probe
+
     def _resolve_columns(self, col_names: List[str], state: SchemaAgentState) -> List[ColumnSnippet]:
         """
         Resolve column identifiers from cache or vector store fallback.
         """
         resolved: List[ColumnSnippet] = []
-        cache_values = [c for cols in state.retrieve_cache.values() for c in cols]
-        cache_index = {c.id: c for c in cache_values}
         for col_name in col_names:
-            if col_name in cache_index:
-                resolved.append(cache_index[col_name])
+            cached = state.cache_index.get(col_name)
+            if cached is not None:
+                resolved.append(cached)
                 continue
             table, _, column = col_name.partition(".")
-            fetched = self.vector_store.search_columns(state.db_id, query=f"{table} {column}", exclude_cols=list(state.seen_columns), top_k=1)
+            fetched = self.vector_store.search_columns(state.db_id, query=f"{table} {column}", exclude_cols=state.seen_columns, top_k=1)
             if fetched:
                 resolved.append(fetched[0])
         return resolved
 
-    def _merge_schema(self, linked_schema: Dict[str, TableSchema], cols_to_add: List[ColumnSnippet]) -> Dict[str, TableSchema]:
+    def _merge_schema(self, linked_schema: Dict[str, TableSchema], cols_to_add: List[ColumnSnippet]) -> List[ColumnSnippet]:
         """
-        Merge new columns into the linked schema dictionary.
+        Merge new columns into the linked schema dictionary and return the ones actually added.
         """
+        added: List[ColumnSnippet] = []
         for col in cols_to_add:
-            table_schema = linked_schema.setdefault(col.table, TableSchema(table=col.table))
-            existing_cols = {c.id: c for c in table_schema.columns}
-            if col.id not in existing_cols:
+            table_schema = linked_schema.get(col.table)
+            if table_schema is None:
+                table_schema = linked_schema[col.table] = TableSchema(table=col.table)
+            if col.id not in table_schema.column_ids:
                 table_schema.columns.append(col)
-        return linked_schema
+                table_schema.column_ids.add(col.id)
+                added.append(col)
+        return added
 
     def _build_prompt(self, state: SchemaAgentState) -> str:
         """
         Construct the LLM prompt summarizing current state and action schema.
         """
-        schema_summary = "; ".join(
-            f"{t.table}: " + ", ".join(f"{c.name}:{c.type}" for c in t.columns[:5])
-            for t in state.linked_schema.values()
-        )
-        trace_tail = state.trace[-2:]
-        trace_text = "\n".join(f"step {t.step}: actions={t.llm_actions}, observations={t.observations}" for t in trace_tail)
+        schema_summary = "; ".join(state.table_summary_cache.values())
+        trace_text = "\n".join(t.rendered for t in state.trace[-2:])
         prompt = f"""
 You are a schema linking agent. Goal: maximize recall with minimal columns.
 User query: {state.user_query}
@@ -237,6 +321,25 @@ Ensure at least one feedback action per step.
 """
         return prompt.strip()
 
+    def _summarize_table(self, table_schema: TableSchema) -> str:
+        """
+        Render the truncated prompt summary of one linked table.
+        """
+        return f"{table_schema.table}: " + ", ".join(f"{c.name}:{c.type}" for c in table_schema.columns[:5])
+
+    def _render_step(self, step: TraceStep) -> str:
+        """
+        Render a trace step for the prompt once, when it is recorded.
+        JSON keeps the quoting consistent with the action format the LLM is asked to emit.
+        """
+        payload = json.dumps(
+            {"actions": step.llm_actions, "observations": step.observations},
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str,
+        )
+        return f"step {step.step}: {payload}"
+
     def _call_llm(self, prompt: str) -> List[Dict[str, Any]]:
         """
         Call the LLM and parse the JSON action list. Fall back to stop when parsing fails.
@@ -254,32 +357,27 @@ Ensure at least one feedback action per step.
         """
         Convert TableSchema objects to plain dicts for the context.
         """
-        out: Dict[str, Any] = {}
-        for table, schema in linked_schema.items():
-            out[table] = {
-                "columns": [
-                    {
-                        "name": c.name,
-                        "type": c.type,
-                        "role": "pk" if c.is_pk else ("fk" if c.is_fk else "col"),
-                        "description": c.description,
-                        "sample_values": c.sample_values[:3],
-                    }
-                    for c in schema.columns
-                ]
-            }
-        return out
-
-    def _serialize_trace(self, trace: List[TraceStep]) -> List[Dict[str, Any]]:
-        """
-        Convert TraceStep objects to dicts for the context.
-        """
-        return [
-            {
-                "step": t.step,
-                "llm_actions": t.llm_actions,
-                "observations": t.observations,
-                "forced_stop": t.forced_stop,
-            }
-            for t in trace
-        ]
+        return {table: {"columns": [self._serialize_column(c) for c in schema.columns]} for table, schema in linked_schema.items()}
+
+    def _serialize_column(self, col: ColumnSnippet) -> Dict[str, Any]:
+        """
+        Convert a single ColumnSnippet to a plain dict for the context.
+        """
+        return {
+            "name": col.name,
+            "type": col.type,
+            "role": "pk" if col.is_pk else ("fk" if col.is_fk else "col"),
+            "description": col.description,
+            "sample_values": col.sample_values[:3],
+        }
+
+    def _serialize_step(self, step: TraceStep) -> Dict[str, Any]:
+        """
+        Convert a TraceStep to a dict for the context.
+        """
+        return {
+            "step": step.step,
+            "llm_actions": step.llm_actions,
+            "observations": step.observations,
+            "forced_stop": step.forced_stop,
+        }
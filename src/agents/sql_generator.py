@@ -2,7 +2,10 @@
 SQL generator agent that turns linked schema and query into candidate SQL.
 """
 
-from typing import Any, Dict, List
+from collections import OrderedDict
+from itertools import islice
+from threading import Lock
+from typing import Any, Dict, List, Optional
 
 from src.core.context import QueryContext
 from src.infra.llm import LLMClient
@@ -15,24 +18,57 @@ class SQLGeneratorAgent:
 
     name = "sql_generator"
 
-    def __init__(self, llm: LLMClient, max_candidates: int = 2):
+    def __init__(self, llm: LLMClient, max_candidates: int = 2, cache_size: int = 1024):
         """
         Create a SQL generator with an LLM client.
+        cache_size bounds the prompt→candidates LRU; 0 disables caching.
         """
         self.llm = llm
         self.max_candidates = max_candidates
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._cache_lock = Lock()
 
     def generate(self, ctx: QueryContext) -> Dict[str, Any]:
         """
         Generate one or more SQL candidates and return a state dict.
         """
+        # The prompt is deterministic in (user_query, linked_schema), so it doubles as the cache key.
         prompt = self._build_prompt(ctx)
+        cached = self._cache_get(prompt)
+        if cached is not None:
+            return {"candidates": list(cached)}
         raw = self.llm.chat(prompt=prompt)
         # Expect lines of SQL; split safely.
-        candidates = [line.strip() for line in raw.splitlines() if line.strip()][: self.max_candidates]
+        candidates = list(islice(filter(None, map(str.strip, raw.splitlines())), self.max_candidates))
         if not candidates:
             candidates = ["SELECT 1;"]
-        return {"candidates": candidates}
+        self._cache_put(prompt, candidates)
+        return {"candidates": list(candidates)}
+
+    def _cache_get(self, prompt: str) -> Optional[List[str]]:
+        """
+        Return cached candidates for a prompt and mark them as recently used.
+        """
+        if self.cache_size <= 0:
+            return None
+        with self._cache_lock:
+            candidates = self._cache.get(prompt)
+            if candidates is not None:
+                self._cache.move_to_end(prompt)
+            return candidates
+
+    def _cache_put(self, prompt: str, candidates: List[str]) -> None:
+        """
+        Store candidates for a prompt, evicting the least recently used entry when full.
+        """
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[prompt] = candidates
+            self._cache.move_to_end(prompt)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
 
     def _build_prompt(self, ctx: QueryContext) -> str:
         """
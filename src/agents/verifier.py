@@ -2,6 +2,7 @@
 Verifier agent that probes candidate SQL and chooses a final decision.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Tuple
 
 from src.core.context import QueryContext
@@ -15,12 +16,13 @@ class VerifierAgent:
 
     name = "verifier"
 
-    def __init__(self, db_service: DBIntrospectionService, max_rows: int = 5):
+    def __init__(self, db_service: DBIntrospectionService, max_rows: int = 5, max_workers: int = 4):
         """
         Create a verifier using the provided DB introspection service.
         """
         self.db_service = db_service
         self.max_rows = max_rows
+        self.max_workers = max_workers
 
     def verify(self, ctx: QueryContext, db_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         """
@@ -30,8 +32,7 @@ class VerifierAgent:
         execution_records: List[Dict[str, Any]] = []
         final_decision: Dict[str, Any] = {}
 
-        for sql in candidates:
-            probe = self.db_service.exec_probe(db_id=db_id, sql=sql, row_limit=self.max_rows)
+        for sql, probe in zip(candidates, self._probe_all(db_id, candidates)):
             execution_records.append(self._to_record(sql, probe))
             if probe.status == "ok" and not final_decision:
                 final_decision = {"sql": sql, "status": "ok", "result_summary": probe.summary}
@@ -45,6 +46,16 @@ class VerifierAgent:
         }
         return execution_state, final_decision
 
+    def _probe_all(self, db_id: str, candidates: List[str]) -> List[ProbeResult]:
+        """
+        Probe all candidates concurrently and return results in candidate order.
+        """
+        if len(candidates) <= 1 or self.max_workers <= 1:
+            return [self.db_service.exec_probe(db_id=db_id, sql=sql, row_limit=self.max_rows) for sql in candidates]
+        with ThreadPoolExecutor(max_workers=min(len(candidates), self.max_workers)) as pool:
+            futures = [pool.submit(self.db_service.exec_probe, db_id=db_id, sql=sql, row_limit=self.max_rows) for sql in candidates]
+            return [f.result() for f in futures]
+
     def _to_record(self, sql: str, probe: ProbeResult) -> Dict[str, Any]:
         """
         Convert a ProbeResult into a serializable dict.
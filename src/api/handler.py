@@ -2,7 +2,8 @@
 Entry functions that connect API/UI requests to the orchestrator.
 """
 
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, List
 
 from src.api.models import QueryRequest, QueryResponse
 from src.core.pipeline import Orchestrator
@@ -26,6 +27,19 @@ class RequestHandler:
         ctx = self.orchestrator.run(request)
         return QueryResponse.from_context(ctx, status="ok", message="completed")
 
+    async def handle_async(self, request: QueryRequest) -> QueryResponse:
+        """
+        Execute the pipeline in a worker thread so an event loop can serve other requests meanwhile.
+        """
+        return await asyncio.to_thread(self.handle, request)
+
+    async def handle_many(self, requests: List[QueryRequest]) -> List[QueryResponse]:
+        """
+        Execute several requests concurrently and return responses in request order.
+        Pair with BatchingLLMClient to coalesce their LLM calls into batched requests.
+        """
+        return list(await asyncio.gather(*(self.handle_async(r) for r in requests)))
+
     def health(self) -> Dict[str, Any]:
         """
         Provide a minimal health/info payload for monitoring endpoints.
@@ -2,13 +2,12 @@
 Request and response models for the NL2SQL API layer.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import Any, Dict, List, Optional
-import uuid
 import time
 
 
-@dataclass
+@dataclass(slots=True)
 class QueryOptions:
     """
     Options attached to a request to control generation/runtime behavior.
@@ -19,7 +18,7 @@ class QueryOptions:
     max_latency_ms: int = 5000
 
 
-@dataclass
+@dataclass(slots=True)
 class QueryRequest:
     """
     Incoming query payload built by API/UI/queue consumers.
@@ -38,11 +37,11 @@ class QueryRequest:
             "user_id": self.user_id,
             "session_id": self.session_id,
             "query_text": self.query_text,
-            "options": self.options.__dict__,
+            "options": asdict(self.options),
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class QueryResponse:
     """
     Lightweight response returned to the caller while the full QueryContext is persisted.
@@ -63,7 +62,7 @@ class QueryResponse:
         Build a QueryResponse from a QueryContext dict representation.
         """
         return cls(
-            query_id=ctx.get("query_id", str(uuid.uuid4())),
+            query_id=ctx["query_id"],
             session_id=ctx.get("session", {}).get("id", ""),
             status=status,
             message=message,
@@ -76,10 +75,10 @@ class QueryResponse:
 
 def _calc_latency(ctx: Dict[str, Any]) -> Optional[int]:
     """
-    Compute latency from stored timestamps if available.
+    Compute latency in milliseconds from stored nanosecond timestamps if available.
     """
     start_ts = ctx.get("metrics", {}).get("timestamps", {}).get("start")
     end_ts = ctx.get("metrics", {}).get("timestamps", {}).get("end")
     if start_ts is None or end_ts is None:
         return None
-    return int((end_ts - start_ts) * 1000)
+    return (end_ts - start_ts) // 1_000_000
@@ -2,7 +2,7 @@
 Definition of QueryContext, the shared state flowing through agents.
 """
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from typing import Any, Dict, List
 import uuid
 import time
@@ -10,14 +10,14 @@ import time
 from src.api.models import QueryRequest
 
 
-def now_ts() -> float:
+def now_ts() -> int:
     """
-    Return a monotonic timestamp in seconds for latency tracking.
+    Return a monotonic timestamp in nanoseconds for latency tracking.
     """
-    return time.time()
+    return time.monotonic_ns()
 
 
-@dataclass
+@dataclass(slots=True)
 class QueryContext:
     """
     End-to-end context that every agent reads/writes incrementally.
@@ -41,7 +41,7 @@ class QueryContext:
         Build an empty context from the incoming query request.
         """
         ctx = cls(
-            query_id=str(uuid.uuid4()),
+            query_id=uuid.uuid4().hex,
             user={"id": request.user_id, "roles": [], "permissions": ["readonly" if request.options.readonly else "readwrite"]},
             session={"id": request.session_id, "history_summary": {}},
             user_query=request.query_text,
@@ -52,8 +52,21 @@ class QueryContext:
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert context to a plain dict for persistence or response building.
+        Nested state is already plain dicts/lists, so it is shared rather than deep-copied.
         """
-        return asdict(self)
+        return {
+            "query_id": self.query_id,
+            "user": self.user,
+            "session": self.session,
+            "user_query": self.user_query,
+            "router": self.router,
+            "schema_state": self.schema_state,
+            "retrieval_state": self.retrieval_state,
+            "sql_generation_state": self.sql_generation_state,
+            "execution_state": self.execution_state,
+            "final_decision": self.final_decision,
+            "metrics": self.metrics,
+        }
 
     def close(self) -> None:
         """
@@ -39,20 +39,28 @@ class Orchestrator:
         self.vector_store = vector_store
         self.context_store = context_store
         self.db_catalog = db_catalog or []
+        self._catalog_index: Dict[str, Dict[str, Any]] = {db["db_id"]: db for db in self.db_catalog}
+        self._table_list_cache: Dict[str, List[str]] = {}
 
     def run(self, request: QueryRequest) -> Dict[str, Any]:
         """
         Execute the full NL2SQL pipeline and return the final QueryContext as dict.
         """
         ctx = QueryContext.from_request(request)
-        table_catalog = {db["db_id"]: db for db in self.db_catalog}
 
-        router_output = self.router.route(ctx.user_query, table_catalog)
+        router_output = self.router.route(ctx.user_query, self._catalog_index)
         ctx.router = router_output
 
         chosen_db = router_output.get("chosen_db")
         table_list = self._get_table_list(chosen_db)
 
+        if not chosen_db or not table_list:
+            # Nothing to link or probe against; downstream agents would only produce a failing result.
+            ctx.final_decision = {"sql": None, "status": "failed", "reason": "no_database"}
+            ctx.close()
+            self._persist(ctx)
+            return ctx.to_dict()
+
         ctx = self.schema_agent.run(
             user_query=ctx.user_query,
             db_id=chosen_db,
@@ -74,17 +82,23 @@ class Orchestrator:
     def _get_table_list(self, db_id: Optional[str]) -> List[str]:
         """
         Fetch a table list for the selected database from catalog or vector store stub.
+        Non-empty table lists are treated as static and cached per db_id; empty results are retried.
+        Callers get their own copy, since the list ends up in the (mutable) context.
         """
         if db_id is None:
             return []
+        cached = self._table_list_cache.get(db_id)
+        if cached is not None:
+            return list(cached)
+        tables: List[str] = []
         if self.vector_store:
             tables = self.vector_store.list_tables(db_id)
-            if tables:
-                return tables
-        for db in self.db_catalog:
-            if db.get("db_id") == db_id:
-                return db.get("example_tables", [])
-        return []
+        if not tables:
+            tables = self._catalog_index.get(db_id, {}).get("example_tables", [])
+        if tables:
+            # Own the cached list: the source may be the store's table cache or the catalog entry.
+            self._table_list_cache[db_id] = list(tables)
+        return list(tables)
 
     def _persist(self, ctx: QueryContext) -> None:
         """
@@ -2,14 +2,52 @@
 DB introspection service abstraction and a stub implementation.
 """
 
+import functools
 import json
 import os
 import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 
+from src.infra.schema_json import load_table_json
 
-@dataclass
+
+_FROM_RE = re.compile(r"from\s+([^\s;]+)", re.IGNORECASE)
+_FORBIDDEN_KEYWORDS = frozenset({"insert", "update", "delete", "merge", "alter", "drop", "truncate", "create"})
+_FORBIDDEN_RE = re.compile(r"\b(" + "|".join(sorted(_FORBIDDEN_KEYWORDS)) + r")\b", re.IGNORECASE)
+_LIMIT_RE = re.compile(r"\blimit\s+\d+", re.IGNORECASE)
+# Snowflake errnos meaning the session behind a still-open connection is gone (session/token expired).
+_SESSION_GONE_ERRNOS = frozenset({390111, 390112, 390114})
+
+
+@functools.lru_cache(maxsize=1024)
+def _extract_from(sql: str) -> Optional[str]:
+    """
+    Parse the short table name from a simple SELECT ... FROM clause.
+    Cached on the SQL text so retried and re-verified probes skip the regex.
+    """
+    match = _FROM_RE.search(sql)
+    if not match:
+        return None
+    raw = match.group(1).strip().strip(";")
+    raw = raw.strip('"').strip("'")
+    # take last component to align with JSON filenames
+    return raw.split(".")[-1]
+
+
+def _close_quietly(conn: Any) -> None:
+    """
+    Close a connection, ignoring errors from already-dead sessions.
+    """
+    try:
+        conn.close()
+    except Exception:  # pragma: no cover - best-effort cleanup
+        pass
+
+
+@dataclass(slots=True)
 class ProbeResult:
     """
     Normalized result of a probe execution.
@@ -61,13 +99,19 @@ class SpiderSnowDBIntrospectionService(DBIntrospectionService):
     Probe service backed by Spider2-snow DB_schema JSON sample rows.
     """
 
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, max_cached_tables: int = 256, max_sample_rows: int = 100):
         """
         Args:
             base_path: Root folder containing per-db schema directories (Spider2/spider2-snow/resource/databases).
+            max_cached_tables: Number of parsed table JSON files kept in the LRU cache.
+            max_sample_rows: Sample rows kept per table; probes never return more than this.
         """
         self.base_path = base_path
-        self._table_meta: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.max_cached_tables = max_cached_tables
+        self.max_sample_rows = max_sample_rows
+        self._table_meta: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._table_meta_lock = threading.Lock()
+        self._dir_index: Dict[str, Tuple[Dict[str, str], Dict[str, str]]] = {}
 
     def exec_probe(self, db_id: str, sql: str, row_limit: int = 5) -> ProbeResult:
         """
@@ -83,7 +127,8 @@ class SpiderSnowDBIntrospectionService(DBIntrospectionService):
             return ProbeResult(status="error", error_type="missing_table", error_message_short=f"table {table_key} not found")
 
         sample_rows = table_meta.get("sample_rows", []) or []
-        limited_rows = sample_rows[:row_limit] if isinstance(sample_rows, list) else []
+        # Rows live in the process-wide table cache; copy them so callers can't mutate later probes.
+        limited_rows = [dict(r) if isinstance(r, dict) else r for r in sample_rows[:row_limit]] if isinstance(sample_rows, list) else []
         return ProbeResult(
             status="ok",
             row_count=len(limited_rows),
@@ -95,40 +140,76 @@ class SpiderSnowDBIntrospectionService(DBIntrospectionService):
         """
         Parse a table name from a simple SELECT ... FROM clause.
         """
-        match = re.search(r"from\s+([^\s;]+)", sql, flags=re.IGNORECASE)
-        if not match:
-            return None
-        raw = match.group(1).strip().strip(";")
-        raw = raw.strip('"').strip("'")
-        # take last component to align with JSON filenames
-        return raw.split(".")[-1]
+        return _extract_from(sql)
 
     def _load_table_meta(self, db_id: str, table: str) -> Optional[Dict[str, Any]]:
         """
-        Load table metadata JSON and cache it.
+        Load table metadata JSON and cache it in a bounded LRU.
         """
         key = (db_id, table.lower())
-        if key in self._table_meta:
-            return self._table_meta[key]
+        with self._table_meta_lock:
+            cached = self._table_meta.get(key)
+            if cached is not None:
+                self._table_meta.move_to_end(key)
+                return cached
 
         db_dir = os.path.join(self.base_path, db_id, db_id)
-        if not os.path.isdir(db_dir):
-            return None
-        candidate = os.path.join(db_dir, f"{table}.json")
-        if not os.path.exists(candidate):
-            # try upper/lower variations
-            alt = os.path.join(db_dir, f"{table.upper()}.json")
-            alt2 = os.path.join(db_dir, f"{table.lower()}.json")
-            candidate = alt if os.path.exists(alt) else alt2
-        if not os.path.exists(candidate):
+        filename = self._find_table_file(db_id, db_dir, table)
+        if filename is None:
             return None
         try:
-            with open(candidate, "r", encoding="utf-8") as f:
-                meta = json.load(f)
-                self._table_meta[key] = meta
-                return meta
+            meta = load_table_json(os.path.join(db_dir, filename), max_sample_rows=self.max_sample_rows)
         except Exception:
             return None
+        with self._table_meta_lock:
+            self._table_meta[key] = meta
+            self._table_meta.move_to_end(key)
+            while len(self._table_meta) > self.max_cached_tables:
+                self._table_meta.popitem(last=False)
+        return meta
+
+    def _find_table_file(self, db_id: str, db_dir: str, table: str) -> Optional[str]:
+        """
+        Resolve a table to its JSON filename: exact name first, then UPPER, then lower, then any case.
+        A miss re-lists the directory once so tables added after the first probe are still found.
+        """
+        filename = self._match_table_file(self._table_files(db_id, db_dir), table)
+        if filename is None:
+            self._dir_index.pop(db_id, None)
+            filename = self._match_table_file(self._table_files(db_id, db_dir), table)
+        return filename
+
+    def _match_table_file(self, index: Optional[Tuple[Dict[str, str], Dict[str, str]]], table: str) -> Optional[str]:
+        """
+        Look a table up in a (stem -> filename, folded stem -> filename) directory index.
+        """
+        if index is None:
+            return None
+        by_stem, by_folded = index
+        for stem in (table, table.upper(), table.lower()):
+            filename = by_stem.get(stem)
+            if filename is not None:
+                return filename
+        return by_folded.get(table.lower())
+
+    def _table_files(self, db_id: str, db_dir: str) -> Optional[Tuple[Dict[str, str], Dict[str, str]]]:
+        """
+        Index the db directory's JSON filenames by exact and lowercased stem, listing it once.
+        A missing directory is not cached, so a database added later is picked up.
+        """
+        index = self._dir_index.get(db_id)
+        if index is None:
+            try:
+                entries = sorted(os.listdir(db_dir))
+            except OSError:
+                return None
+            by_stem = {fn[:-5]: fn for fn in entries if fn.lower().endswith(".json")}
+            by_folded: Dict[str, str] = {}
+            for stem, fn in by_stem.items():
+                by_folded.setdefault(stem.lower(), fn)  # sorted listing keeps the pick deterministic
+            index = (by_stem, by_folded)
+            self._dir_index[db_id] = index
+        return index
 
 
 class SnowflakeProbeService(DBIntrospectionService):
@@ -136,7 +217,15 @@ class SnowflakeProbeService(DBIntrospectionService):
     Online probe service backed by a Snowflake warehouse (read-only usage).
     """
 
-    def __init__(self, credential_path: str, default_db: Optional[str] = None, default_schema: Optional[str] = None, warehouse: Optional[str] = None, role: Optional[str] = None):
+    def __init__(
+        self,
+        credential_path: str,
+        default_db: Optional[str] = None,
+        default_schema: Optional[str] = None,
+        warehouse: Optional[str] = None,
+        role: Optional[str] = None,
+        max_connections: int = 8,
+    ):
         """
         Args:
             credential_path: Path to JSON credential file (compatible with spider-agent-snow snowflake_credential.json).
@@ -144,13 +233,30 @@ class SnowflakeProbeService(DBIntrospectionService):
             default_schema: Default schema to USE.
             warehouse: Warehouse name override.
             role: Role override.
+            max_connections: Open sessions kept in the LRU pool; the least recently used one is closed beyond this.
         """
         self.credential_path = credential_path
         self.default_db = default_db
         self.default_schema = default_schema
         self.warehouse = warehouse
         self.role = role
+        self.max_connections = max_connections
         self._cred_cache: Optional[Dict[str, Any]] = None
+        # Open connections keyed by (db_id, schema), least recently used first; each is bound to its
+        # database/schema once and keeps a heartbeat, so the pool is bounded.
+        self._pool: "OrderedDict[Tuple[str, Optional[str]], Any]" = OrderedDict()
+        self._pool_lock = threading.Lock()
+        # Per-key locks serialize handshakes for one key without blocking probes on other keys;
+        # an entry only lives while its handshake is in progress.
+        self._connect_locks: Dict[Tuple[str, Optional[str]], threading.Lock] = {}
+        self._connector: Any = None
+        self._connector_error: Optional[str] = None
+        try:
+            import snowflake.connector as connector  # type: ignore
+
+            self._connector = connector
+        except Exception as exc:  # pragma: no cover - import guard
+            self._connector_error = str(exc)
 
     def exec_probe(self, db_id: str, sql: str, row_limit: int = 5) -> ProbeResult:
         """
@@ -161,46 +267,139 @@ class SnowflakeProbeService(DBIntrospectionService):
         if not self._cred_cache:
             return ProbeResult(status="error", error_type="credential", error_message_short="missing snowflake credentials")
 
-        if not self._is_select(sql):
+        sql_lower = sql.lower()
+        if not self._is_select(sql, sql_lower):
             return ProbeResult(status="error", error_type="forbidden", error_message_short="only SELECT probes allowed")
 
-        safe_sql = self._enforce_limit(sql, row_limit)
+        safe_sql = self._enforce_limit(sql, row_limit, sql_lower)
 
-        try:
-            import snowflake.connector  # type: ignore
-        except Exception as exc:  # pragma: no cover - import guard
-            return ProbeResult(status="error", error_type="missing_dep", error_message_short=f"install snowflake-connector-python: {exc}")
+        if self._connector is None:
+            return ProbeResult(status="error", error_type="missing_dep", error_message_short=f"install snowflake-connector-python: {self._connector_error}")
 
+        conn = None
         try:
-            conn = snowflake.connector.connect(
-                account=self._cred_cache.get("account"),
-                user=self._cred_cache.get("user"),
-                password=self._cred_cache.get("password"),
-                warehouse=self.warehouse or self._cred_cache.get("warehouse"),
-                database=self.default_db or db_id or self._cred_cache.get("database"),
-                schema=self.default_schema or self._cred_cache.get("schema"),
-                role=self.role or self._cred_cache.get("role"),
-            )
+            conn = self._get_connection(db_id)
             cur = conn.cursor()
-            if db_id:
-                cur.execute(f'USE DATABASE "{db_id}"')
-            if self.default_schema:
-                cur.execute(f'USE SCHEMA "{self.default_schema}"')
-            cur.execute(safe_sql)
-            rows = cur.fetchmany(row_limit)
-            col_names = [c[0] for c in cur.description] if cur.description else []
+            try:
+                cur.execute(safe_sql)
+                rows = cur.fetchmany(row_limit)
+                col_names = [c[0] for c in cur.description] if cur.description else []
+            finally:
+                cur.close()
             sample_rows = [dict(zip(col_names, r)) for r in rows]
-            cur.close()
-            conn.close()
             return ProbeResult(
                 status="ok",
                 row_count=len(sample_rows),
                 sample_rows=sample_rows,
-                summary={"message": "snowflake probe", "table_hint": self._extract_table(db_id, sql)},
+                summary={"message": "snowflake probe", "table_hint": _extract_from(sql)},
             )
         except Exception as exc:  # pragma: no cover - network/db errors
+            if conn is not None and (conn.is_closed() or self._is_connection_error(exc)):
+                self._discard_connection(db_id, conn)
             return ProbeResult(status="error", error_type="db_error", error_message_short=str(exc))
 
+    def close(self) -> None:
+        """
+        Close all pooled connections.
+        """
+        with self._pool_lock:
+            conns, self._pool = list(self._pool.values()), OrderedDict()
+        for conn in conns:
+            _close_quietly(conn)
+
+    def _get_connection(self, db_id: str) -> Any:
+        """
+        Return a pooled connection for the database, opening and binding it on first use.
+        The handshake runs outside _pool_lock so a slow connect only delays probes for the same key.
+        """
+        key = (db_id, self.default_schema)
+        with self._pool_lock:
+            conn = self._pool.get(key)
+            if conn is not None:
+                self._pool.move_to_end(key)
+                return conn
+            connect_lock = self._connect_locks.setdefault(key, threading.Lock())
+        try:
+            with connect_lock:
+                with self._pool_lock:
+                    conn = self._pool.get(key)
+                if conn is not None:
+                    return conn  # another thread finished the handshake while we waited
+                return self._pool_put(key, self._open_connection(db_id))
+        finally:
+            with self._pool_lock:
+                if self._connect_locks.get(key) is connect_lock:
+                    del self._connect_locks[key]
+
+    def _open_connection(self, db_id: str) -> Any:
+        """
+        Connect and bind the session to the database/schema.
+        """
+        conn = self._connector.connect(
+            account=self._cred_cache.get("account"),
+            user=self._cred_cache.get("user"),
+            password=self._cred_cache.get("password"),
+            warehouse=self.warehouse or self._cred_cache.get("warehouse"),
+            database=self.default_db or db_id or self._cred_cache.get("database"),
+            schema=self.default_schema or self._cred_cache.get("schema"),
+            role=self.role or self._cred_cache.get("role"),
+            client_session_keep_alive=True,
+        )
+        cur = conn.cursor()
+        try:
+            if db_id:
+                cur.execute(f'USE DATABASE "{db_id}"')
+            if self.default_schema:
+                cur.execute(f'USE SCHEMA "{self.default_schema}"')
+        except Exception:
+            conn.close()
+            raise
+        finally:
+            cur.close()
+        return conn
+
+    def _pool_put(self, key: Tuple[str, Optional[str]], conn: Any) -> Any:
+        """
+        Insert a fresh connection, closing whatever falls out of the LRU.
+        If another handshake for the key already won, keep that one and close ours.
+        """
+        evicted: List[Any] = []
+        with self._pool_lock:
+            existing = self._pool.get(key)
+            if existing is not None:
+                self._pool.move_to_end(key)
+                evicted.append(conn)
+                conn = existing
+            else:
+                self._pool[key] = conn
+                while len(self._pool) > self.max_connections:
+                    evicted.append(self._pool.popitem(last=False)[1])
+        for old in evicted:
+            _close_quietly(old)
+        return conn
+
+    def _is_connection_error(self, exc: Exception) -> bool:
+        """
+        Return True when the error means the connection itself is unusable (network, or expired session/auth).
+        """
+        if getattr(exc, "errno", None) in _SESSION_GONE_ERRNOS:
+            return True
+        errors = getattr(self._connector, "errors", None)
+        conn_errors = tuple(
+            cls for cls in (getattr(errors, "OperationalError", None), getattr(errors, "InterfaceError", None)) if isinstance(cls, type)
+        )
+        return bool(conn_errors) and isinstance(exc, conn_errors)
+
+    def _discard_connection(self, db_id: str, conn: Any) -> None:
+        """
+        Drop a dead connection from the pool so the next probe reconnects.
+        """
+        key = (db_id, self.default_schema)
+        with self._pool_lock:
+            if self._pool.get(key) is conn:
+                del self._pool[key]
+        _close_quietly(conn)
+
     def _load_credentials(self) -> Optional[Dict[str, Any]]:
         """
         Load credentials from JSON file.
@@ -213,17 +412,27 @@ class SnowflakeProbeService(DBIntrospectionService):
         except Exception:
             return None
 
-    def _is_select(self, sql: str) -> bool:
+    def _is_select(self, sql: str, sql_lower: Optional[str] = None) -> bool:
         """
         Allow only SELECT-like statements.
+        sql_lower lets callers share one lowercased copy across the guard helpers.
         """
-        forbidden = re.compile(r"\b(insert|update|delete|merge|alter|drop|truncate|create)\b", re.IGNORECASE)
-        return bool(re.match(r"\s*select\b", sql, flags=re.IGNORECASE)) and not forbidden.search(sql)
+        head = (sql_lower if sql_lower is not None else sql.lower()).lstrip()
+        if not head.startswith("select"):
+            return False
+        if len(head) > 6 and (head[6].isalnum() or head[6] == "_"):
+            return False  # e.g. "selectx", not the SELECT keyword
+        # Substring checks are a cheap necessary condition; the regex only confirms word boundaries
+        # (e.g. rejects "drop" but not "created_at") when a keyword substring is present.
+        if not any(keyword in head for keyword in _FORBIDDEN_KEYWORDS):
+            return True
+        return not _FORBIDDEN_RE.search(head)
 
-    def _enforce_limit(self, sql: str, row_limit: int) -> str:
+    def _enforce_limit(self, sql: str, row_limit: int, sql_lower: Optional[str] = None) -> str:
         """
         Ensure a LIMIT clause is present to bound results.
         """
-        if re.search(r"\blimit\s+\d+", sql, flags=re.IGNORECASE):
+        low = sql_lower if sql_lower is not None else sql.lower()
+        if "limit" in low and _LIMIT_RE.search(low):
             return sql
         return f"{sql.rstrip().rstrip(';')} LIMIT {row_limit}"
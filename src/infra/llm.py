@@ -2,7 +2,9 @@
 LLM gateway abstraction with a stub implementation for offline runs.
 """
 
-from typing import Any
+import threading
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
 
 
 class LLMClient:
@@ -16,16 +18,111 @@ class LLMClient:
         """
         raise NotImplementedError("chat must be implemented by subclasses")
 
+    def chat_batch(self, prompts: List[str], **kwargs: Any) -> List[str]:
+        """
+        Send several prompts and return responses in prompt order.
+        Gateways with native batch inference should override; the default calls chat per prompt.
+        """
+        return [self.chat(prompt=p, **kwargs) for p in prompts]
+
 
 class EchoLLMClient(LLMClient):
     """
     Simple LLM stub that echoes instructions or produces deterministic defaults.
     """
 
+    _ACTIONS_MARKER = "Allowed actions"
+    _ACTIONS_REPLY = '[{"type": "stop_action"}]'
+    _DEFAULT_REPLY = "SELECT 1;"
+
     def chat(self, prompt: str, **kwargs: Any) -> str:
         """
         Produce a predictable response for testing without external LLMs.
         """
-        if "Allowed actions" in prompt:
-            return '[{"type": "stop_action"}]'
-        return "SELECT 1;"
+        return self._ACTIONS_REPLY if self._ACTIONS_MARKER in prompt else self._DEFAULT_REPLY
+
+
+@dataclass(slots=True)
+class _PendingPrompt:
+    """
+    A prompt waiting in the coalescing buffer together with its eventual response.
+    """
+
+    prompt: str
+    done: threading.Event = field(default_factory=threading.Event)
+    lead: bool = False
+    response: Optional[str] = None
+    error: Optional[BaseException] = None
+
+
+class BatchingLLMClient(LLMClient):
+    """
+    Wrapper that coalesces concurrent chat calls into a single chat_batch call on the inner client.
+    The first caller in a window waits up to window_ms (or until max_batch prompts queue up), then
+    sends up to max_batch queued prompts at once and hands leadership of any overflow to the next
+    queued caller; the other callers block until their response is ready.
+    """
+
+    def __init__(self, inner: LLMClient, window_ms: float = 20.0, max_batch: int = 16):
+        """
+        Create a coalescing wrapper around an LLM client.
+        """
+        if max_batch < 1:
+            raise ValueError(f"max_batch must be >= 1, got {max_batch}")
+        if window_ms < 0:
+            raise ValueError(f"window_ms must be >= 0, got {window_ms}")
+        self.inner = inner
+        self.window_s = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._cond = threading.Condition()
+        self._pending: List[_PendingPrompt] = []
+
+    def chat(self, prompt: str, **kwargs: Any) -> str:
+        """
+        Queue the prompt for the next batch and return its response.
+        Calls with extra kwargs cannot share a batch and go straight to the inner client.
+        """
+        if kwargs:
+            return self.inner.chat(prompt=prompt, **kwargs)
+
+        item = _PendingPrompt(prompt=prompt)
+        with self._cond:
+            self._pending.append(item)
+            item.lead = len(self._pending) == 1
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+            # Followers sleep until their response arrives or a full leader hands leadership over.
+            self._cond.wait_for(lambda: item.lead or item.done.is_set())
+
+        if not item.done.is_set():
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._pending) >= self.max_batch, timeout=self.window_s)
+                batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch :]
+                if self._pending:
+                    self._pending[0].lead = True
+                    self._cond.notify_all()
+            self._flush(batch)
+
+        item.done.wait()
+        if item.error is not None:
+            raise item.error
+        return item.response  # type: ignore[return-value]
+
+    def _flush(self, batch: List[_PendingPrompt]) -> None:
+        """
+        Send a batch to the inner client and hand each response back to its caller.
+        """
+        try:
+            responses = self.inner.chat_batch([item.prompt for item in batch])
+            if len(responses) != len(batch):
+                raise ValueError(f"chat_batch returned {len(responses)} responses for {len(batch)} prompts")
+            for item, response in zip(batch, responses):
+                item.response = response
+        except BaseException as exc:  # propagate to every waiting caller
+            for item in batch:
+                item.error = exc
+        finally:
+            with self._cond:
+                for item in batch:
+                    item.done.set()
+                self._cond.notify_all()
@@ -0,0 +1,92 @@
+"""
+Readers for Spider2-snow per-table schema JSON files.
+"""
+
+import json
+import os
+import re
+from decimal import Decimal
+from typing import Any, BinaryIO, Dict, Optional
+
+try:  # optional: incremental parsing keeps unused sample rows out of memory
+    import ijson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    ijson = None
+
+try:  # optional: faster whole-file parsing when streaming is not used
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Fields read by the schema store and probe services; sample_rows is handled separately.
+_TABLE_KEYS = ("table_name", "table_fullname", "column_names", "column_types", "description")
+# Event-by-event parsing in Python only beats a C whole-file parse when most of the file is skipped rows.
+_STREAM_MIN_BYTES = 256 * 1024
+# orjson silently turns integers beyond 64 bits into floats; any run of 19+ digits may be one.
+_WIDE_INT_RE = re.compile(rb"\d{19}")
+
+
+def load_table_json(path: str, max_sample_rows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Parse a table JSON file, keeping at most max_sample_rows entries of sample_rows.
+    Files of at least _STREAM_MIN_BYTES are streamed with ijson when installed so skipped rows are
+    never materialized; smaller files are parsed whole with orjson (or json) and sliced.
+    Files that may hold integers wider than 64 bits use json so NUMBER(38,0) values stay exact.
+    """
+    with open(path, "rb") as f:
+        if max_sample_rows is not None and ijson is not None and os.fstat(f.fileno()).st_size >= _STREAM_MIN_BYTES:
+            return _stream_table_json(f, max_sample_rows)
+        raw = f.read()
+    meta = orjson.loads(raw) if orjson is not None and not _WIDE_INT_RE.search(raw) else json.loads(raw)
+    if max_sample_rows is not None and isinstance(meta.get("sample_rows"), list):
+        meta["sample_rows"] = meta["sample_rows"][:max_sample_rows]
+    return meta
+
+
+def _stream_table_json(f: BinaryIO, max_sample_rows: int) -> Dict[str, Any]:
+    """
+    Build the top-level object from parser events, dropping sample rows past the limit.
+    Stops reading once the limit is hit and every field in _TABLE_KEYS has been seen.
+    Numbers match json.load: integers stay exact (NUMBER(38,0) ids exceed 64 bits) and
+    non-integers become floats.
+    """
+    meta: Dict[str, Any] = {}
+    key: Optional[str] = None
+    builder: Optional[Any] = None
+    depth = 0
+    kept = 0
+    skipping = False
+
+    for prefix, event, value in ijson.parse(f):
+        if builder is None:
+            # Root-level events: only map keys matter; each starts a new value builder.
+            if prefix == "" and event == "map_key":
+                key = value
+                builder = ijson.ObjectBuilder()
+                skipping = False
+            continue
+
+        if key == "sample_rows" and prefix == "sample_rows.item" and event not in ("map_key", "end_map", "end_array"):
+            # Start of a new row (or a scalar row).
+            if kept >= max_sample_rows:
+                if all(k in meta for k in _TABLE_KEYS):
+                    meta["sample_rows"] = builder.value
+                    return meta
+                skipping = True
+            else:
+                kept += 1
+                skipping = False
+        if skipping and prefix.startswith("sample_rows.item"):
+            continue
+
+        if event == "number" and isinstance(value, Decimal):
+            value = float(value)
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            meta[key] = builder.value
+            builder = None
+    return meta
@@ -4,7 +4,13 @@ Context persistence helper.
 
 import json
 import os
-from typing import Optional
+import threading
+from typing import Any, Dict, Optional
+
+try:  # optional: C serializer, several times faster than json.dump for large contexts
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
 
 from src.core.context import QueryContext
 
@@ -14,11 +20,13 @@ class ContextStore:
     Persists QueryContext objects for auditing and evaluation.
     """
 
-    def __init__(self, base_dir: str = "output/contexts"):
+    def __init__(self, base_dir: str = "output/contexts", fsync: bool = False):
         """
         Initialize the store with a base directory.
+        Set fsync to flush each file to disk before it becomes visible.
         """
         self.base_dir = base_dir
+        self.fsync = fsync
         os.makedirs(self.base_dir, exist_ok=True)
 
     def save(self, ctx: QueryContext) -> str:
@@ -26,6 +34,32 @@ class ContextStore:
         Write the context to a JSON file and return the path.
         """
         path = os.path.join(self.base_dir, f"{ctx.query_id}.json")
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(ctx.to_dict(), f, ensure_ascii=False, indent=2)
+        payload = _dumps(ctx.to_dict())
+        # Write to a sibling temp file and rename so readers never see a truncated JSON.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
         return path
+
+
+def _dumps(payload: Dict[str, Any]) -> bytes:
+    """
+    Serialize a context dict to indented UTF-8 JSON, preferring orjson when installed.
+    Values JSON cannot represent (e.g. Decimal from warehouse rows) are written as strings.
+    orjson rejects integers wider than 64 bits, so those payloads go through the json module.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str)
+        except TypeError:  # orjson.JSONEncodeError subclasses TypeError
+            pass
+    return json.dumps(payload, ensure_ascii=False, indent=2, default=str).encode("utf-8")
@@ -2,14 +2,30 @@
 Schema vector store abstraction plus a stubbed in-memory implementation.
 """
 
-import json
+import functools
+import heapq
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Tuple
+from typing import AbstractSet, Iterable, List, Dict, Tuple
 
+from src.infra.schema_json import load_table_json
 
-@dataclass
+
+_TOKEN_RE = re.compile(r"[^a-zA-Z0-9_]+")
+
+
+@functools.lru_cache(maxsize=256)
+def _tokens_to_pattern(tokens: Tuple[str, ...]) -> "re.Pattern[str]":
+    """
+    Compile an alternation over query tokens; callers pass a sorted, deduplicated tuple
+    so repeated queries reuse the compiled pattern.
+    """
+    return re.compile("|".join(map(re.escape, tokens)))
+
+
+@dataclass(slots=True)
 class ColumnSnippet:
     """
     Compact column record returned by vector search.
@@ -31,17 +47,36 @@ class ColumnSnippet:
         return f"{self.table}.{self.name}"
 
 
+def _as_set(cols: Iterable[str]) -> AbstractSet[str]:
+    """
+    Return the exclusion ids as a set, reusing the caller's set when one is passed.
+    """
+    return cols if isinstance(cols, AbstractSet) else set(cols)
+
+
 class SchemaVectorStoreService:
     """
     Interface for column-level retrieval using embeddings.
     """
 
-    def search_columns(self, db_id: str, query: str, exclude_cols: List[str], top_k: int) -> List[ColumnSnippet]:
+    def search_columns(self, db_id: str, query: str, exclude_cols: Iterable[str], top_k: int) -> List[ColumnSnippet]:
         """
         Retrieve column snippets relevant to the query. Override in production.
+        exclude_cols may be any iterable of column ids; callers typically pass their live seen-set.
         """
         raise NotImplementedError("search_columns must be implemented by subclasses")
 
+    def search_columns_batch(self, db_id: str, queries: List[str], exclude_cols: Iterable[str], top_k: int) -> List[List[ColumnSnippet]]:
+        """
+        Retrieve column snippets for several queries at once, preserving query order.
+        Backends that can embed/search in one call should override; the default fans out over threads.
+        """
+        if len(queries) <= 1:
+            return [self.search_columns(db_id=db_id, query=q, exclude_cols=exclude_cols, top_k=top_k) for q in queries]
+        with ThreadPoolExecutor(max_workers=min(len(queries), 8)) as pool:
+            futures = [pool.submit(self.search_columns, db_id, q, exclude_cols, top_k) for q in queries]
+            return [f.result() for f in futures]
+
     def list_tables(self, db_id: str) -> List[str]:
         """
         List available tables for a database. Override in production.
@@ -66,13 +101,20 @@ class StubSchemaVectorStore(SchemaVectorStoreService):
             ]
         }
 
-    def search_columns(self, db_id: str, query: str, exclude_cols: List[str], top_k: int) -> List[ColumnSnippet]:
+    def search_columns(self, db_id: str, query: str, exclude_cols: Iterable[str], top_k: int) -> List[ColumnSnippet]:
         """
         Return a slice of the mock schema, excluding already seen columns.
         """
-        cols = [c for c in self.mock_schema.get(db_id, []) if c.id not in set(exclude_cols)]
+        exclude = _as_set(exclude_cols)
+        cols = [c for c in self.mock_schema.get(db_id, []) if c.id not in exclude]
         return cols[:top_k]
 
+    def search_columns_batch(self, db_id: str, queries: List[str], exclude_cols: Iterable[str], top_k: int) -> List[List[ColumnSnippet]]:
+        """
+        In-memory search is cheap; run queries sequentially instead of spawning threads.
+        """
+        return [self.search_columns(db_id=db_id, query=q, exclude_cols=exclude_cols, top_k=top_k) for q in queries]
+
     def list_tables(self, db_id: str) -> List[str]:
         """
         Return table names from the stub schema.
@@ -86,101 +128,144 @@ class SpiderSnowSchemaStore(SchemaVectorStoreService):
     Schema store that reads Spider2-snow DB_schema JSON/DDL files directly.
     """
 
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, max_workers: int = 8):
         """
         Args:
             base_path: Root folder containing per-db directories with DB_schema (e.g., Spider2/spider2-snow/resource/databases).
+            max_workers: Threads used to read a database's table JSON files on first load.
         """
         self.base_path = base_path
+        self.max_workers = max_workers
         self._column_cache: Dict[str, List[ColumnSnippet]] = {}
         self._table_cache: Dict[str, List[str]] = {}
+        # Parallel per-db arrays aligned with _column_cache, precomputed for scoring.
+        self._col_ids: Dict[str, List[str]] = {}
+        self._name_lc: Dict[str, List[str]] = {}
+        self._search_lc: Dict[str, List[str]] = {}
 
     def list_databases(self) -> List[str]:
         """
         List database ids available in the base path.
         """
-        if not os.path.isdir(self.base_path):
+        try:
+            with os.scandir(self.base_path) as entries:
+                return sorted(e.name for e in entries if e.is_dir())
+        except OSError:
             return []
-        return sorted([d for d in os.listdir(self.base_path) if os.path.isdir(os.path.join(self.base_path, d))])
 
     def list_tables(self, db_id: str) -> List[str]:
         """
-        Return table names for a database.
+        Return table names for a database, derived from table filenames without parsing JSON.
         """
-        self._ensure_loaded(db_id)
+        self._ensure_tables_loaded(db_id)
         return self._table_cache.get(db_id, [])
 
-    def search_columns(self, db_id: str, query: str, exclude_cols: List[str], top_k: int) -> List[ColumnSnippet]:
+    def search_columns(self, db_id: str, query: str, exclude_cols: Iterable[str], top_k: int) -> List[ColumnSnippet]:
         """
         Retrieve column snippets by simple keyword overlap on table/column names.
         """
-        self._ensure_loaded(db_id)
+        self._ensure_columns_loaded(db_id)
         candidates = self._column_cache.get(db_id, [])
         if not candidates:
             return []
 
-        exclude = set(exclude_cols)
-        tokens = [tok for tok in re.split(r"[^a-zA-Z0-9_]+", query.lower()) if tok]
+        exclude = _as_set(exclude_cols)
+        tokens = [tok for tok in _TOKEN_RE.split(query.lower()) if tok]
+        col_ids = self._col_ids[db_id]
+        names = self._name_lc[db_id]
+        texts = self._search_lc[db_id]
+        # One C-level alternation scan rules out non-matching columns before per-token counting.
+        pattern = _tokens_to_pattern(tuple(sorted(set(tokens)))) if tokens else None
 
-        def score(col: ColumnSnippet) -> Tuple[int, int]:
-            name = col.name.lower()
-            table = col.table.lower()
-            hits = sum(tok in name or tok in table for tok in tokens)
-            return hits, len(name)
+        def score(i: int) -> Tuple[int, int]:
+            text = texts[i]
+            if pattern is None or not pattern.search(text):
+                return 0, len(names[i])
+            return sum(tok in text for tok in tokens), len(names[i])
 
-        filtered = [c for c in candidates if c.id not in exclude]
-        ranked = sorted(filtered, key=score, reverse=True)
-        return ranked[:top_k]
+        # nlargest keeps sorted(..., reverse=True) order for ties and evaluates score once per column.
+        filtered = (i for i, col_id in enumerate(col_ids) if col_id not in exclude)
+        return [candidates[i] for i in heapq.nlargest(top_k, filtered, key=score)]
 
-    def _ensure_loaded(self, db_id: str) -> None:
+    def search_columns_batch(self, db_id: str, queries: List[str], exclude_cols: Iterable[str], top_k: int) -> List[List[ColumnSnippet]]:
         """
-        Lazy-load schema columns and tables for a database.
+        Keyword scoring is CPU-bound; run queries sequentially instead of spawning threads.
         """
-        if db_id in self._column_cache:
+        return [self.search_columns(db_id=db_id, query=q, exclude_cols=exclude_cols, top_k=top_k) for q in queries]
+
+    def _ensure_tables_loaded(self, db_id: str) -> None:
+        """
+        Lazy-load table names for a database from its JSON filenames only.
+        """
+        if db_id in self._table_cache:
             return
-        db_dir = os.path.join(self.base_path, db_id, db_id)
-        if not os.path.isdir(db_dir):
-            self._column_cache[db_id] = []
-            self._table_cache[db_id] = []
+        try:
+            with os.scandir(os.path.join(self.base_path, db_id, db_id)) as entries:
+                stems = [e.name[:-5] for e in entries if e.name.lower().endswith(".json")]
+        except OSError:
+            stems = []
+        self._table_cache[db_id] = sorted({stem.split(".")[-1] for stem in stems})
+
+    def _ensure_columns_loaded(self, db_id: str) -> None:
+        """
+        Lazy-load schema columns for a database by parsing its table JSON files.
+        """
+        if db_id in self._column_cache:
             return
+        try:
+            with os.scandir(os.path.join(self.base_path, db_id, db_id)) as entries:
+                json_paths = [e.path for e in entries if e.name.lower().endswith(".json")]
+        except OSError:
+            json_paths = []
+        if len(json_paths) > 1 and self.max_workers > 1:
+            # File reads overlap across threads; results keep directory order.
+            with ThreadPoolExecutor(max_workers=min(len(json_paths), self.max_workers)) as pool:
+                parsed = list(pool.map(self._parse_table_file, json_paths))
+        else:
+            parsed = [self._parse_table_file(path) for path in json_paths]
+
+        columns: List[ColumnSnippet] = [col for table_columns in parsed for col in table_columns]
+        self._col_ids[db_id] = [c.id for c in columns]
+        self._name_lc[db_id] = [c.name.lower() for c in columns]
+        # Tokens never contain NUL, so "tok in name or tok in table" equals "tok in name\0table".
+        self._search_lc[db_id] = [f"{n}\x00{c.table.lower()}" for n, c in zip(self._name_lc[db_id], columns)]
+        self._column_cache[db_id] = columns
 
+    def _parse_table_file(self, json_path: str) -> List[ColumnSnippet]:
+        """
+        Parse one table JSON file into column snippets; unreadable files yield none.
+        """
+        try:
+            # Only the first two sample rows feed column sample values.
+            table_meta = load_table_json(json_path, max_sample_rows=2)
+        except Exception:
+            return []
+        entry = os.path.basename(json_path)
+        table_name = table_meta.get("table_name") or table_meta.get("table_fullname") or entry.replace(".json", "")
+        short_table = table_name.split(".")[-1]
+        col_names = table_meta.get("column_names", [])
+        col_types = table_meta.get("column_types", [])
+        descriptions = table_meta.get("description", []) if isinstance(table_meta.get("description"), list) else []
+        sample_rows = table_meta.get("sample_rows", [])
         columns: List[ColumnSnippet] = []
-        tables: List[str] = []
-        for entry in os.listdir(db_dir):
-            if not entry.lower().endswith(".json"):
-                continue
-            json_path = os.path.join(db_dir, entry)
-            try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    table_meta = json.load(f)
-            except Exception:
-                continue
-            table_name = table_meta.get("table_name") or table_meta.get("table_fullname") or entry.replace(".json", "")
-            short_table = table_name.split(".")[-1]
-            tables.append(short_table)
-            col_names = table_meta.get("column_names", [])
-            col_types = table_meta.get("column_types", [])
-            descriptions = table_meta.get("description", []) if isinstance(table_meta.get("description"), list) else []
-            sample_rows = table_meta.get("sample_rows", [])
-            for idx, col_name in enumerate(col_names):
-                col_type = col_types[idx] if idx < len(col_types) else ""
-                desc = descriptions[idx] if idx < len(descriptions) else None
-                sample_vals = []
-                if sample_rows and isinstance(sample_rows, list):
-                    for row in sample_rows[:2]:
-                        if isinstance(row, dict) and col_name in row:
-                            sample_vals.append(str(row[col_name]))
-                columns.append(
-                    ColumnSnippet(
-                        table=short_table,
-                        name=col_name,
-                        type=col_type,
-                        description=desc or "",
-                        sample_values=sample_vals,
-                    )
+        for idx, col_name in enumerate(col_names):
+            col_type = col_types[idx] if idx < len(col_types) else ""
+            desc = descriptions[idx] if idx < len(descriptions) else None
+            sample_vals = []
+            if sample_rows and isinstance(sample_rows, list):
+                for row in sample_rows[:2]:
+                    if isinstance(row, dict) and col_name in row:
+                        sample_vals.append(str(row[col_name]))
+            columns.append(
+                ColumnSnippet(
+                    table=short_table,
+                    name=col_name,
+                    type=col_type,
+                    description=desc or "",
+                    sample_values=sample_vals,
                 )
-        self._column_cache[db_id] = columns
-        self._table_cache[db_id] = sorted(set(tables))
+            )
+        return columns
 
     def db_catalog(self) -> List[Dict[str, str]]:
         """
@@ -3,6 +3,8 @@ Minimal CLI entry to run the NL2SQL pipeline with stubbed services.
 """
 
 import argparse
+import atexit
+import functools
 import os
 from pathlib import Path
 
@@ -19,9 +21,11 @@ from src.infra.db import StubDBIntrospectionService, SpiderSnowDBIntrospectionSe
 from src.infra.storage import ContextStore
 
 
+@functools.lru_cache(maxsize=1)
 def build_orchestrator() -> Orchestrator:
     """
     Wire stub services and agents into an orchestrator.
+    The result is built once per process; call build_orchestrator.cache_clear() after changing the env config.
     """
     llm = EchoLLMClient()
 
@@ -40,6 +44,8 @@ def build_orchestrator() -> Orchestrator:
         vector_store = SpiderSnowSchemaStore(spider_base)
         if spider_mode == "online" and os.path.exists(snowflake_cred):
             db_service = SnowflakeProbeService(credential_path=snowflake_cred)
+            # Pooled sessions keep heartbeats alive; end them when the process exits.
+            atexit.register(db_service.close)
         else:
             db_service = SpiderSnowDBIntrospectionService(spider_base)
         db_catalog = vector_store.db_catalog()
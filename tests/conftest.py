@@ -0,0 +1,26 @@
+"""
+Shared pytest fixtures.
+"""
+
+import pytest
+
+from src.core.pipeline import Orchestrator
+from src.infra.storage import ContextStore
+from src.main import build_orchestrator
+
+
+@pytest.fixture
+def orchestrator(tmp_path):
+    """
+    Stub-wired orchestrator that persists contexts under tmp_path instead of the repo's output/ dir.
+    """
+    base = build_orchestrator()
+    return Orchestrator(
+        router=base.router,
+        schema_agent=base.schema_agent,
+        sql_generator=base.sql_generator,
+        verifier=base.verifier,
+        vector_store=base.vector_store,
+        context_store=ContextStore(base_dir=str(tmp_path)),
+        db_catalog=base.db_catalog,
+    )
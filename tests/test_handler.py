@@ -0,0 +1,31 @@
+"""
+Tests for the request handler facade.
+"""
+
+import asyncio
+
+from src.api.handler import RequestHandler
+from src.api.models import QueryRequest
+
+
+def test_handler_builds_response_from_context(orchestrator, tmp_path):
+    """
+    Ensure the handler returns the context's query id and a non-negative latency.
+    """
+    handler = RequestHandler(orchestrator)
+    response = handler.handle(QueryRequest(user_id="tester", session_id="sess-test", query_text="total orders"))
+    assert (tmp_path / f"{response.query_id}.json").is_file()
+    assert len(response.query_id) == 32
+    assert response.session_id == "sess-test"
+    assert isinstance(response.latency_ms, int) and response.latency_ms >= 0
+
+
+def test_handler_handle_many_preserves_order(orchestrator, tmp_path):
+    """
+    Ensure concurrent handling returns one response per request in order.
+    """
+    handler = RequestHandler(orchestrator)
+    requests = [QueryRequest(user_id="tester", session_id=f"sess-{i}", query_text="total orders") for i in range(3)]
+    responses = asyncio.run(handler.handle_many(requests))
+    assert [r.session_id for r in responses] == ["sess-0", "sess-1", "sess-2"]
+    assert len(list(tmp_path.glob("*.json"))) == 3
@@ -0,0 +1,101 @@
+"""
+Tests for LLM client helpers.
+"""
+
+import threading
+from typing import Any, List
+
+import pytest
+
+from src.infra.llm import BatchingLLMClient, LLMClient
+
+
+class RecordingLLMClient(LLMClient):
+    """
+    LLM stub that upper-cases prompts and records each batch it receives.
+    """
+
+    def __init__(self):
+        self.batches: List[List[str]] = []
+
+    def chat(self, prompt: str, **kwargs: Any) -> str:
+        return prompt.upper()
+
+    def chat_batch(self, prompts: List[str], **kwargs: Any) -> List[str]:
+        self.batches.append(list(prompts))
+        return super().chat_batch(prompts, **kwargs)
+
+
+def test_batching_client_coalesces_concurrent_calls():
+    """
+    Ensure concurrent chat calls are sent as one batch and each caller gets its own response.
+    """
+    inner = RecordingLLMClient()
+    client = BatchingLLMClient(inner, window_ms=2000, max_batch=3)
+    results = {}
+
+    def call(prompt: str) -> None:
+        results[prompt] = client.chat(prompt)
+
+    threads = [threading.Thread(target=call, args=(p,)) for p in ["a", "b", "c"]]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {"a": "A", "b": "B", "c": "C"}
+    assert len(inner.batches) == 1 and sorted(inner.batches[0]) == ["a", "b", "c"]
+
+
+def test_batching_client_single_call_flushes_after_window():
+    """
+    Ensure a lone caller is served once the window elapses.
+    """
+    inner = RecordingLLMClient()
+    client = BatchingLLMClient(inner, window_ms=5)
+    assert client.chat("x") == "X"
+    assert inner.batches == [["x"]]
+
+
+def test_batching_client_caps_batches_and_serves_overflow():
+    """
+    Ensure no batch exceeds max_batch and callers beyond it are still served by a later batch.
+    """
+    inner = RecordingLLMClient()
+    client = BatchingLLMClient(inner, window_ms=50, max_batch=2)
+    prompts = [f"p{i}" for i in range(7)]
+    results = {}
+
+    def call(prompt: str) -> None:
+        results[prompt] = client.chat(prompt)
+
+    threads = [threading.Thread(target=call, args=(p,)) for p in prompts]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    assert results == {p: p.upper() for p in prompts}
+    assert all(len(batch) <= 2 for batch in inner.batches)
+    assert sorted(p for batch in inner.batches for p in batch) == prompts
+
+
+def test_batching_client_rejects_short_batch_response():
+    """
+    Ensure a chat_batch that returns too few responses raises instead of returning None.
+    """
+
+    class ShortBatchClient(RecordingLLMClient):
+        def chat_batch(self, prompts: List[str], **kwargs: Any) -> List[str]:
+            return []
+
+    client = BatchingLLMClient(ShortBatchClient(), window_ms=1)
+    with pytest.raises(ValueError):
+        client.chat("x")
+
+
+@pytest.mark.parametrize("kwargs", [{"max_batch": 0}, {"max_batch": -1}, {"window_ms": -5}])
+def test_batching_client_rejects_invalid_settings(kwargs):
+    """
+    Ensure settings that would stall the leader are rejected up front.
+    """
+    with pytest.raises(ValueError):
+        BatchingLLMClient(RecordingLLMClient(), **kwargs)
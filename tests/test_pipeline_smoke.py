@@ -4,16 +4,88 @@ Smoke test for the NL2SQL pipeline with stub components.
 
 from src.main import build_orchestrator
 from src.api.models import QueryRequest
+from src.core.pipeline import Orchestrator
+from src.infra.vector_store import StubSchemaVectorStore
 
 
-def test_pipeline_smoke():
+def test_pipeline_smoke(orchestrator):
     """
     Ensure the orchestrator runs end-to-end with stub services.
     """
-    orchestrator = build_orchestrator()
     request = QueryRequest(user_id="tester", session_id="sess-test", query_text="上个月美国客户的订单金额总和是多少？")
     ctx = orchestrator.run(request)
     assert ctx["query_id"]
     assert ctx["router"]["chosen_db"]
     assert "linked_schema" in ctx["schema_state"]
     assert ctx["sql_generation_state"]["candidates"]
+
+
+def test_pipeline_short_circuits_without_database():
+    """
+    Ensure an empty catalog fails fast without running schema linking or SQL generation.
+    """
+    base = build_orchestrator()
+    orchestrator = Orchestrator(
+        router=base.router,
+        schema_agent=base.schema_agent,
+        sql_generator=base.sql_generator,
+        verifier=base.verifier,
+        vector_store=StubSchemaVectorStore(),
+        db_catalog=[],
+    )
+    ctx = orchestrator.run(QueryRequest(user_id="tester", session_id="sess-test", query_text="anything"))
+    assert ctx["final_decision"] == {"sql": None, "status": "failed", "reason": "no_database"}
+    assert ctx["schema_state"] == {}
+    assert ctx["sql_generation_state"] == {}
+
+
+def test_build_orchestrator_is_memoized():
+    """
+    Ensure repeated builds reuse the same wired orchestrator until the cache is cleared.
+    """
+    first = build_orchestrator()
+    assert build_orchestrator() is first
+    build_orchestrator.cache_clear()
+    assert build_orchestrator() is not first
+
+
+def test_empty_table_list_is_not_cached():
+    """
+    Ensure a transient empty list_tables result is retried on the next request instead of cached.
+    """
+
+    class FlakyStore(StubSchemaVectorStore):
+        def __init__(self):
+            super().__init__()
+            self.calls = 0
+
+        def list_tables(self, db_id):
+            self.calls += 1
+            return [] if self.calls == 1 else super().list_tables(db_id)
+
+    base = build_orchestrator()
+    store = FlakyStore()
+    orchestrator = Orchestrator(
+        router=base.router,
+        schema_agent=base.schema_agent,
+        sql_generator=base.sql_generator,
+        verifier=base.verifier,
+        vector_store=store,
+        db_catalog=[{"db_id": "sales", "name": "Sales DW", "short_desc": "stub database"}],
+    )
+    assert orchestrator._get_table_list("sales") == []
+    assert orchestrator._get_table_list("sales") == ["customers", "orders"]
+    assert orchestrator._get_table_list("sales") == ["customers", "orders"]
+    assert store.calls == 2
+
+
+def test_table_list_in_context_is_not_shared(orchestrator):
+    """
+    Ensure editing a returned context's table_list does not leak into later requests for the db.
+    """
+    request = QueryRequest(user_id="tester", session_id="sess-test", query_text="total orders")
+    first = orchestrator.run(request)
+    first["schema_state"]["table_list"].append("INJECTED")
+    second = orchestrator.run(request)
+    assert "INJECTED" not in second["schema_state"]["table_list"]
+    assert "INJECTED" not in orchestrator.vector_store.list_tables(second["router"]["chosen_db"])
@@ -0,0 +1,40 @@
+"""
+Unit tests for RouterAgent database selection.
+"""
+
+from src.agents.router import RouterAgent
+from src.infra.llm import EchoLLMClient
+
+
+def test_router_picks_db_with_most_token_overlap():
+    """
+    Ensure the router prefers the database whose description shares the most query tokens.
+    """
+    router = RouterAgent(llm=EchoLLMClient())
+    catalog = {
+        "sales": {"db_id": "sales", "short_desc": "orders and customers"},
+        "hr": {"db_id": "hr", "short_desc": "employees payroll and departments"},
+    }
+    out = router.route("total payroll per employees", catalog)
+    assert out["chosen_db"] == "hr"
+    assert sorted(out["candidate_dbs"]) == ["hr", "sales"]
+
+
+def test_router_empty_catalog():
+    """
+    Ensure an empty catalog yields no chosen database.
+    """
+    router = RouterAgent(llm=EchoLLMClient())
+    assert router.route("anything", {})["chosen_db"] == ""
+
+
+def test_router_indexed_path_matches_linear_scan():
+    """
+    Ensure the inverted-index path picks the same database as the linear scan.
+    """
+    catalog = {f"db{i:03d}": {"db_id": f"db{i:03d}", "short_desc": f"table{i} shared words"} for i in range(60)}
+    catalog["db042"]["short_desc"] = "payroll employees shared"
+    linear = RouterAgent(llm=EchoLLMClient(), index_threshold=1000)
+    indexed = RouterAgent(llm=EchoLLMClient(), index_threshold=10)
+    for query in ["employees payroll", "shared words", "nothing matches"]:
+        assert indexed.route(query, catalog)["chosen_db"] == linear.route(query, catalog)["chosen_db"]
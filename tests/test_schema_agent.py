@@ -0,0 +1,147 @@
+"""
+Unit tests for the SchemaAgent linking loop with a scripted LLM.
+"""
+
+import json
+from typing import Any, List
+
+from src.agents.schema import SchemaAgent, SchemaAgentConfig
+from src.api.models import QueryRequest
+from src.core.context import QueryContext
+from src.infra.db import StubDBIntrospectionService
+from src.infra.llm import LLMClient
+from src.infra.vector_store import StubSchemaVectorStore
+
+
+class ScriptedLLMClient(LLMClient):
+    """
+    LLM stub that replays a fixed list of action batches, then stops.
+    """
+
+    def __init__(self, steps: List[List[dict]]):
+        self.steps = list(steps)
+        self.prompts: List[str] = []
+
+    def chat(self, prompt: str, **kwargs: Any) -> str:
+        self.prompts.append(prompt)
+        if self.steps:
+            return json.dumps(self.steps.pop(0))
+        return '[{"type": "stop_action"}]'
+
+
+def _run(steps: List[List[dict]], config: SchemaAgentConfig) -> QueryContext:
+    llm = ScriptedLLMClient(steps)
+    agent = SchemaAgent(llm=llm, vector_store=StubSchemaVectorStore(), db_service=StubDBIntrospectionService(), config=config)
+    ctx = QueryContext.from_request(QueryRequest(user_id="u", session_id="s", query_text="orders by country"))
+    return agent.run(user_query=ctx.user_query, db_id="sales", table_list=["customers", "orders"], ctx=ctx)
+
+
+def test_schema_agent_adds_retrieved_columns():
+    """
+    Ensure retrieved columns added via add_schema appear in the serialized linked schema and trace.
+    """
+    steps = [
+        [{"type": "retrieve_schema", "query": "country", "top_k": 4}],
+        [{"type": "verify_schema", "sql": "select country from customers"}, {"type": "add_schema", "columns": ["customers.country"]}],
+    ]
+    ctx = _run(steps, SchemaAgentConfig(initial_top_m=2, max_steps=4))
+    linked = ctx.schema_state["linked_schema"]
+    assert [c["name"] for c in linked["orders"]["columns"]] == ["order_id", "customer_id"]
+    assert [c["name"] for c in linked["customers"]["columns"]] == ["country"]
+    trace = ctx.schema_state["linking_trace"]
+    assert [t["step"] for t in trace] == [0, 1, 2]
+    assert not any(t["forced_stop"] for t in trace)
+
+
+def test_schema_agent_marks_forced_stop():
+    """
+    Ensure the last trace entry is flagged when max_steps is exhausted.
+    """
+    steps = [[{"type": "retrieve_schema", "query": "orders"}]] * 2
+    ctx = _run(steps, SchemaAgentConfig(initial_top_m=2, max_steps=2))
+    trace = ctx.schema_state["linking_trace"]
+    assert len(trace) == 2
+    assert trace[-1]["forced_stop"] is True
+
+
+def test_schema_agent_memoizes_repeated_probes():
+    """
+    Ensure identical probe SQL within a run hits the database only once.
+    """
+    calls: List[str] = []
+
+    class CountingDB(StubDBIntrospectionService):
+        def exec_probe(self, db_id: str, sql: str, row_limit: int = 5):
+            calls.append(sql)
+            return super().exec_probe(db_id, sql, row_limit)
+
+    steps = [
+        [{"type": "verify_schema", "sql": "select 1"}, {"type": "explore_schema", "sql": " select 1 "}],
+        [{"type": "verify_schema", "sql": "select 1"}],
+    ]
+    agent = SchemaAgent(llm=ScriptedLLMClient(steps), vector_store=StubSchemaVectorStore(), db_service=CountingDB(), config=SchemaAgentConfig(max_steps=4))
+    ctx = QueryContext.from_request(QueryRequest(user_id="u", session_id="s", query_text="q"))
+    agent.run(user_query="q", db_id="sales", table_list=[], ctx=ctx)
+    assert calls == ["select 1"]
+
+
+def test_schema_agent_batches_retrievals_in_one_step():
+    """
+    Ensure several retrieve_schema actions in one step go through a single batch call.
+    """
+    batches: List[List[str]] = []
+
+    class BatchingStore(StubSchemaVectorStore):
+        def search_columns_batch(self, db_id, queries, exclude_cols, top_k):
+            batches.append(list(queries))
+            return super().search_columns_batch(db_id, queries, exclude_cols, top_k)
+
+    steps = [[{"type": "retrieve_schema", "query": "country"}, {"type": "retrieve_schema", "query": "date"}]]
+    agent = SchemaAgent(llm=ScriptedLLMClient(steps), vector_store=BatchingStore(), db_service=StubDBIntrospectionService(), config=SchemaAgentConfig(initial_top_m=1))
+    ctx = QueryContext.from_request(QueryRequest(user_id="u", session_id="s", query_text="q"))
+    agent.run(user_query="q", db_id="sales", table_list=[], ctx=ctx)
+    assert batches == [["country", "date"]]
+    observations = ctx.schema_state["linking_trace"][0]["observations"]
+    assert [o["query"] for o in observations] == ["country", "date"]
+
+
+def test_schema_agent_prompt_renders_trace_as_json():
+    """
+    Ensure the recent trace in the prompt is rendered as compact JSON.
+    """
+    steps = [[{"type": "retrieve_schema", "query": "country"}]]
+    llm = ScriptedLLMClient(steps)
+    agent = SchemaAgent(llm=llm, vector_store=StubSchemaVectorStore(), db_service=StubDBIntrospectionService(), config=SchemaAgentConfig(initial_top_m=1))
+    ctx = QueryContext.from_request(QueryRequest(user_id="u", session_id="s", query_text="q"))
+    agent.run(user_query="q", db_id="sales", table_list=[], ctx=ctx)
+    assert 'step 0: {"actions":[{"type":"retrieve_schema","query":"country"}]' in llm.prompts[1]
+
+
+def test_schema_agent_skips_actions_after_stop():
+    """
+    Ensure actions emitted after stop_action are not executed.
+    """
+    steps = [[{"type": "verify_schema", "sql": "select 1"}, {"type": "stop_action"}, {"type": "retrieve_schema", "query": "x"}]]
+    ctx = _run(steps, SchemaAgentConfig(initial_top_m=1, max_steps=4))
+    trace = ctx.schema_state["linking_trace"]
+    assert len(trace) == 1
+    assert [o.get("action") for o in trace[0]["observations"]] == ["verify_schema", "stop_action"]
+
+
+def test_schema_agent_linked_schema_is_not_shared_across_runs():
+    """
+    Ensure editing a returned linked_schema column does not leak into the next run's context.
+    """
+    agent = SchemaAgent(llm=ScriptedLLMClient([]), vector_store=StubSchemaVectorStore(), db_service=StubDBIntrospectionService(), config=SchemaAgentConfig(initial_top_m=2))
+
+    def run_once() -> dict:
+        ctx = QueryContext.from_request(QueryRequest(user_id="u", session_id="s", query_text="orders"))
+        ctx = agent.run(user_query=ctx.user_query, db_id="sales", table_list=["customers", "orders"], ctx=ctx)
+        return ctx.to_dict()["schema_state"]["linked_schema"]["orders"]["columns"][0]
+
+    first = run_once()
+    first["description"] = "annotated by caller"
+    first["sample_values"].append("x")
+    second = run_once()
+    assert second["description"] == ""
+    assert second["sample_values"] == []
@@ -0,0 +1,255 @@
+"""
+Offline tests for SnowflakeProbeService SQL guards (no warehouse connection needed).
+"""
+
+import threading
+
+import pytest
+
+from src.infra.db import SnowflakeProbeService
+
+
+@pytest.fixture
+def service(tmp_path):
+    """
+    Probe service pointed at a non-existent credential file.
+    """
+    return SnowflakeProbeService(credential_path=str(tmp_path / "missing.json"))
+
+
+@pytest.mark.parametrize(
+    "sql",
+    ["SELECT * FROM t", "  select a from t;", "select created_at, updated_by from t", "\nSelect count(*) FROM orders WHERE created_at > '2024-01-01'"],
+)
+def test_is_select_accepts_read_only(service, sql):
+    """
+    Ensure plain SELECT statements pass the read-only guard.
+    """
+    assert service._is_select(sql)
+
+
+@pytest.mark.parametrize(
+    "sql",
+    ["DELETE FROM t", "with x as (select 1) select * from x", "select 1; drop table t", "SELECT * FROM t;INSERT INTO t VALUES (1)", "selectx from t", "select 1,drop"],
+)
+def test_is_select_rejects_writes_and_non_select(service, sql):
+    """
+    Ensure writes, non-SELECT starts, and embedded DML are rejected.
+    """
+    assert not service._is_select(sql)
+
+
+def test_enforce_limit(service):
+    """
+    Ensure a LIMIT is appended only when the SQL has none.
+    """
+    assert service._enforce_limit("select * from t;", 5) == "select * from t LIMIT 5"
+    assert service._enforce_limit("select * from t LIMIT 10", 5) == "select * from t LIMIT 10"
+    assert service._enforce_limit("select * from t\nlimit\t3", 5) == "select * from t\nlimit\t3"
+
+
+def test_exec_probe_without_credentials(service):
+    """
+    Ensure missing credentials surface as a credential error before any connection attempt.
+    """
+    probe = service.exec_probe(db_id="db", sql="select 1")
+    assert probe.status == "error" and probe.error_type == "credential"
+
+
+def test_exec_probe_reports_missing_connector(tmp_path):
+    """
+    Ensure a missing connector package is reported as missing_dep rather than raised.
+    """
+    cred = tmp_path / "cred.json"
+    cred.write_text('{"account": "a", "user": "u", "password": "p"}', encoding="utf-8")
+    service = SnowflakeProbeService(credential_path=str(cred))
+    service._connector = None
+    service._connector_error = "No module named 'snowflake'"
+    probe = service.exec_probe(db_id="db", sql="select 1")
+    assert probe.status == "error" and probe.error_type == "missing_dep"
+
+
+class _FakeCursor:
+    """
+    Cursor stub recording executed statements and returning two rows.
+    """
+
+    description = [("ID", 0, None, None, 38, 0, False), ("NAME", 2, None, None, None, None, True)]
+
+    def __init__(self, log):
+        self.log = log
+
+    def execute(self, sql):
+        self.log.append(sql)
+
+    def fetchmany(self, n):
+        return [(1, "a"), (2, "b")][:n]
+
+    def close(self):
+        pass
+
+
+class _FakeConnection:
+    """
+    Connection stub handing out recording cursors.
+    """
+
+    def __init__(self, log):
+        self.log = log
+        self.closed = False
+
+    def cursor(self):
+        return _FakeCursor(self.log)
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeConnector:
+    """
+    Stand-in for snowflake.connector counting connect calls.
+    """
+
+    def __init__(self):
+        self.connects = 0
+        self.log = []
+        self.opened = []
+
+    def connect(self, **kwargs):
+        self.connects += 1
+        conn = _FakeConnection(self.log)
+        self.opened.append(conn)
+        return conn
+
+
+def test_exec_probe_success_reuses_connection(tmp_path):
+    """
+    Ensure a successful probe returns rows with a table hint and later probes reuse the pooled connection.
+    """
+    cred = tmp_path / "cred.json"
+    cred.write_text('{"account": "a", "user": "u", "password": "p"}', encoding="utf-8")
+    service = SnowflakeProbeService(credential_path=str(cred))
+    fake = _FakeConnector()
+    service._connector = fake
+
+    first = service.exec_probe(db_id="DB", sql="select id, name from DB.PUBLIC.USERS", row_limit=1)
+    second = service.exec_probe(db_id="DB", sql="select id, name from DB.PUBLIC.USERS", row_limit=5)
+
+    assert first.status == "ok" and first.sample_rows == [{"ID": 1, "NAME": "a"}]
+    assert first.summary["table_hint"] == "USERS"
+    assert second.row_count == 2
+    assert fake.connects == 1
+    assert fake.log.count('USE DATABASE "DB"') == 1
+
+
+class _SessionExpired(Exception):
+    """
+    Error shaped like the connector's ProgrammingError for an expired session token.
+    """
+
+    errno = 390114
+
+
+class _ExpiringCursor(_FakeCursor):
+    """
+    Cursor whose SELECTs fail as if the session token had expired.
+    """
+
+    def execute(self, sql):
+        if sql.lower().startswith("select"):
+            raise _SessionExpired("Authentication token has expired.")
+        super().execute(sql)
+
+
+class _ExpiringConnector(_FakeConnector):
+    """
+    Connector whose first connection has an expired session but still reports itself open.
+    """
+
+    def connect(self, **kwargs):
+        conn = super().connect(**kwargs)
+        if self.connects == 1:
+            conn.cursor = lambda: _ExpiringCursor(self.log)
+        return conn
+
+
+class _SlowConnector(_FakeConnector):
+    """
+    Connector whose handshake for database SLOW blocks until released.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def connect(self, **kwargs):
+        if kwargs.get("database") == "SLOW":
+            self.entered.set()
+            self.release.wait(timeout=5)
+        return super().connect(**kwargs)
+
+
+def _credentialed_service(tmp_path, connector):
+    """
+    Build a probe service with a credential file and an injected connector.
+    """
+    cred = tmp_path / "cred.json"
+    cred.write_text('{"account": "a", "user": "u", "password": "p"}', encoding="utf-8")
+    service = SnowflakeProbeService(credential_path=str(cred))
+    service._connector = connector
+    return service
+
+
+def test_expired_session_is_discarded_and_reconnected(tmp_path):
+    """
+    Ensure a connection that fails with an expired session is dropped even though it reports open.
+    """
+    connector = _ExpiringConnector()
+    service = _credentialed_service(tmp_path, connector)
+    first = service.exec_probe(db_id="DB", sql="select id from t")
+    second = service.exec_probe(db_id="DB", sql="select id from t")
+    assert first.status == "error" and first.error_type == "db_error"
+    assert second.status == "ok"
+    assert connector.connects == 2
+
+
+def test_slow_handshake_does_not_block_other_databases(tmp_path):
+    """
+    Ensure a pending connect for one database does not hold the pool lock for others.
+    """
+    connector = _SlowConnector()
+    service = _credentialed_service(tmp_path, connector)
+    slow = threading.Thread(target=service.exec_probe, args=("SLOW", "select id from t"))
+    slow.start()
+    try:
+        assert connector.entered.wait(timeout=5)
+        fast = threading.Thread(target=service.exec_probe, args=("FAST", "select id from t"))
+        fast.start()
+        fast.join(timeout=2)
+        assert not fast.is_alive()
+    finally:
+        connector.release.set()
+        slow.join(timeout=5)
+    assert connector.connects == 2
+
+
+def test_connection_pool_evicts_and_closes_least_recently_used(tmp_path):
+    """
+    Ensure the pool keeps at most max_connections sessions, closes evicted ones, and close() ends the rest.
+    """
+    connector = _FakeConnector()
+    service = _credentialed_service(tmp_path, connector)
+    service.max_connections = 2
+    for db_id in ["A", "B", "A", "C"]:
+        assert service.exec_probe(db_id=db_id, sql="select id from t").status == "ok"
+    conn_a, conn_b, conn_c = connector.opened
+    assert connector.connects == 3
+    assert conn_b.closed and not conn_a.closed and not conn_c.closed
+    assert [key[0] for key in service._pool] == ["A", "C"]
+    assert service._connect_locks == {}
+    service.close()
+    assert conn_a.closed and conn_c.closed and not service._pool
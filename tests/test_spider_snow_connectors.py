@@ -2,6 +2,7 @@
 Connector test against local Spider2-snow DB_schema data if available.
 """
 
+import json
 import os
 from pathlib import Path
 
@@ -9,6 +10,7 @@ import pytest
 
 from src.infra.vector_store import SpiderSnowSchemaStore
 from src.infra.db import SpiderSnowDBIntrospectionService
+from src.infra import schema_json
 
 
 SPIDER_BASE = Path(__file__).resolve().parents[1] / "data" / "spider2-snow" / "resource" / "databases"
@@ -42,3 +44,172 @@ def test_spider_db_probe_reads_samples():
     probe = db_service.exec_probe(db_id=db_id, sql=f"select * from {table} limit 3")
     assert probe.status == "ok"
     assert isinstance(probe.sample_rows, list)
+
+
+def _write_table(db_dir: Path, filename: str, table_name: str, columns, rows) -> None:
+    """
+    Write a minimal Spider2-snow table JSON file.
+    """
+    meta = {
+        "table_name": table_name,
+        "table_fullname": f"SHOP.{table_name}",
+        "column_names": [c for c, _ in columns],
+        "column_types": [t for _, t in columns],
+        "description": [None] * len(columns),
+        "sample_rows": rows,
+    }
+    (db_dir / filename).write_text(json.dumps(meta), encoding="utf-8")
+
+
+@pytest.fixture
+def spider_base(tmp_path):
+    """
+    Build a tiny Spider2-snow style database tree under a temp dir.
+    """
+    db_dir = tmp_path / "SHOP" / "SHOP"
+    db_dir.mkdir(parents=True)
+    _write_table(
+        db_dir,
+        "ORDERS.json",
+        "PUBLIC.ORDERS",
+        [("ORDER_ID", "NUMBER"), ("CUSTOMER_ID", "NUMBER"), ("ORDER_TOTAL", "FLOAT")],
+        [{"ORDER_ID": i, "CUSTOMER_ID": i % 3, "ORDER_TOTAL": i * 1.5} for i in range(10)],
+    )
+    _write_table(
+        db_dir,
+        "customers.json",
+        "PUBLIC.CUSTOMERS",
+        [("CUSTOMER_ID", "NUMBER"), ("COUNTRY", "TEXT")],
+        [{"CUSTOMER_ID": 1, "COUNTRY": "US"}, {"CUSTOMER_ID": 2, "COUNTRY": "FR"}],
+    )
+    (tmp_path / "SHOP" / "SHOP" / "README.md").write_text("not a table", encoding="utf-8")
+    return tmp_path
+
+
+def test_synthetic_schema_store_ranks_columns(spider_base):
+    """
+    Ensure keyword search ranks matching columns first and honours exclusions.
+    """
+    store = SpiderSnowSchemaStore(str(spider_base))
+    assert store.list_databases() == ["SHOP"]
+    assert store.list_tables("SHOP") == ["ORDERS", "customers"]  # filename stems, no JSON parse
+    assert store._column_cache == {}
+    cols = store.search_columns(db_id="SHOP", query="country of customer", exclude_cols=[], top_k=1)
+    assert [c.id for c in cols] == ["CUSTOMERS.COUNTRY"]
+    cols = store.search_columns(db_id="SHOP", query="country", exclude_cols={"CUSTOMERS.COUNTRY"}, top_k=1)
+    assert cols and cols[0].id != "CUSTOMERS.COUNTRY"
+    assert store.search_columns(db_id="MISSING", query="x", exclude_cols=[], top_k=3) == []
+
+
+def test_synthetic_db_probe_limits_rows_and_caches(spider_base):
+    """
+    Ensure probes return at most row_limit sample rows and the table cache stays bounded.
+    """
+    db_service = SpiderSnowDBIntrospectionService(str(spider_base), max_cached_tables=1)
+    probe = db_service.exec_probe(db_id="SHOP", sql="SELECT * FROM SHOP.PUBLIC.ORDERS", row_limit=3)
+    assert probe.status == "ok" and probe.row_count == 3
+    assert probe.summary["table"] == "SHOP.PUBLIC.ORDERS"
+    probe = db_service.exec_probe(db_id="SHOP", sql='select * from "CUSTOMERS";')
+    assert probe.status == "ok" and probe.row_count == 2
+    assert len(db_service._table_meta) == 1
+    assert db_service.exec_probe(db_id="SHOP", sql="select * from missing").error_type == "missing_table"
+    assert db_service.exec_probe(db_id="SHOP", sql="show tables").error_type == "unsupported"
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_load_table_json_caps_sample_rows(spider_base, monkeypatch, streaming):
+    """
+    Ensure table JSON loading keeps only the requested number of sample rows, with or without ijson.
+    """
+    if not streaming:
+        monkeypatch.setattr(schema_json, "ijson", None)
+    elif schema_json.ijson is None:
+        pytest.skip("ijson not installed")
+    else:
+        monkeypatch.setattr(schema_json, "_STREAM_MIN_BYTES", 0)
+    meta = schema_json.load_table_json(str(spider_base / "SHOP" / "SHOP" / "ORDERS.json"), max_sample_rows=2)
+    assert meta["column_names"] == ["ORDER_ID", "CUSTOMER_ID", "ORDER_TOTAL"]
+    assert meta["sample_rows"] == [{"ORDER_ID": 0, "CUSTOMER_ID": 0, "ORDER_TOTAL": 0.0}, {"ORDER_ID": 1, "CUSTOMER_ID": 1, "ORDER_TOTAL": 1.5}]
+
+
+def test_load_table_json_parses_small_files_whole(spider_base, monkeypatch):
+    """
+    Ensure files below the streaming threshold skip the per-event ijson loop.
+    """
+
+    def fail_stream(f, max_sample_rows):
+        raise AssertionError("small files should not be streamed")
+
+    monkeypatch.setattr(schema_json, "_stream_table_json", fail_stream)
+    meta = schema_json.load_table_json(str(spider_base / "SHOP" / "SHOP" / "ORDERS.json"), max_sample_rows=2)
+    assert len(meta["sample_rows"]) == 2
+
+
+@pytest.mark.parametrize("loader", ["ijson", "orjson", "json"])
+def test_wide_integer_sample_rows_are_loaded(tmp_path, monkeypatch, loader):
+    """
+    Ensure integers wider than 64 bits (NUMBER(38,0) ids) neither hide the table nor lose precision on any loader path.
+    """
+    if loader == "ijson":
+        if schema_json.ijson is None:
+            pytest.skip("ijson not installed")
+        monkeypatch.setattr(schema_json, "_STREAM_MIN_BYTES", 0)
+    else:
+        monkeypatch.setattr(schema_json, "ijson", None)
+        if loader == "json":
+            monkeypatch.setattr(schema_json, "orjson", None)
+        elif schema_json.orjson is None:
+            pytest.skip("orjson not installed")
+    db_dir = tmp_path / "BIG" / "BIG"
+    db_dir.mkdir(parents=True)
+    big_id = 12345678901234567890123
+    _write_table(db_dir, "ACCOUNTS.json", "PUBLIC.ACCOUNTS", [("ID", "NUMBER"), ("RATE", "FLOAT")], [{"ID": big_id, "RATE": 0.25}])
+
+    store = SpiderSnowSchemaStore(str(tmp_path))
+    cols = store.search_columns(db_id="BIG", query="id", exclude_cols=[], top_k=5)
+    assert {c.id for c in cols} == {"ACCOUNTS.ID", "ACCOUNTS.RATE"}
+
+    probe = SpiderSnowDBIntrospectionService(str(tmp_path)).exec_probe(db_id="BIG", sql="select * from ACCOUNTS")
+    assert probe.status == "ok"
+    assert probe.sample_rows == [{"ID": big_id, "RATE": 0.25}]
+
+
+def test_synthetic_db_probe_rows_are_not_shared(spider_base):
+    """
+    Ensure mutating returned sample rows does not change what later probes return from the table cache.
+    """
+    db_service = SpiderSnowDBIntrospectionService(str(spider_base))
+    first = db_service.exec_probe(db_id="SHOP", sql="select * from CUSTOMERS", row_limit=2)
+    first.sample_rows[0]["CUSTOMER_ID"] = "MUTATED"
+    second = db_service.exec_probe(db_id="SHOP", sql="select * from CUSTOMERS", row_limit=2)
+    assert second.sample_rows == [{"CUSTOMER_ID": 1, "COUNTRY": "US"}, {"CUSTOMER_ID": 2, "COUNTRY": "FR"}]
+
+
+def test_synthetic_db_probe_finds_tables_added_later(tmp_path):
+    """
+    Ensure a database directory or table file created after an earlier miss is still found.
+    """
+    db_service = SpiderSnowDBIntrospectionService(str(tmp_path))
+    assert db_service.exec_probe(db_id="LATE", sql="select * from ITEMS").error_type == "missing_table"
+
+    db_dir = tmp_path / "LATE" / "LATE"
+    db_dir.mkdir(parents=True)
+    _write_table(db_dir, "ITEMS.json", "PUBLIC.ITEMS", [("ID", "NUMBER")], [{"ID": 1}])
+    assert db_service.exec_probe(db_id="LATE", sql="select * from ITEMS").status == "ok"
+
+    _write_table(db_dir, "PRICES.json", "PUBLIC.PRICES", [("ID", "NUMBER")], [{"ID": 2}])
+    assert db_service.exec_probe(db_id="LATE", sql="select * from prices").sample_rows == [{"ID": 2}]
+
+
+def test_synthetic_db_probe_prefers_exact_case_filename(tmp_path):
+    """
+    Ensure the exact {table}.json file wins over files differing only in case.
+    """
+    db_dir = tmp_path / "MIX" / "MIX"
+    db_dir.mkdir(parents=True)
+    _write_table(db_dir, "orders.json", "PUBLIC.orders", [("ID", "NUMBER")], [{"ID": "lower"}])
+    _write_table(db_dir, "ORDERS.json", "PUBLIC.ORDERS", [("ID", "NUMBER")], [{"ID": "upper"}])
+    _write_table(db_dir, "Events.json", "PUBLIC.Events", [("ID", "NUMBER")], [{"ID": "mixed"}])
+    assert SpiderSnowDBIntrospectionService(str(tmp_path)).exec_probe(db_id="MIX", sql="select * from orders").sample_rows == [{"ID": "lower"}]
+    assert SpiderSnowDBIntrospectionService(str(tmp_path)).exec_probe(db_id="MIX", sql="select * from ORDERS").sample_rows == [{"ID": "upper"}]
+    assert SpiderSnowDBIntrospectionService(str(tmp_path)).exec_probe(db_id="MIX", sql="select * from events").sample_rows == [{"ID": "mixed"}]
@@ -0,0 +1,56 @@
+"""
+Unit tests for SQLGeneratorAgent candidate parsing and caching.
+"""
+
+from typing import Any, List
+
+from src.agents.sql_generator import SQLGeneratorAgent
+from src.api.models import QueryRequest
+from src.core.context import QueryContext
+from src.infra.llm import LLMClient
+
+
+class CountingLLMClient(LLMClient):
+    """
+    LLM stub that returns a fixed reply and records prompts.
+    """
+
+    def __init__(self, reply: str):
+        self.reply = reply
+        self.prompts: List[str] = []
+
+    def chat(self, prompt: str, **kwargs: Any) -> str:
+        self.prompts.append(prompt)
+        return self.reply
+
+
+def _ctx(query: str) -> QueryContext:
+    ctx = QueryContext.from_request(QueryRequest(user_id="u", session_id="s", query_text=query))
+    ctx.schema_state = {"linked_schema": {"orders": {"columns": [{"name": "order_id", "type": "INT"}]}}}
+    return ctx
+
+
+def test_generator_reuses_cached_candidates_for_identical_prompt():
+    """
+    Ensure an identical query/schema pair does not trigger a second LLM call.
+    """
+    llm = CountingLLMClient("SELECT 1;\n\nSELECT 2;\nSELECT 3;")
+    agent = SQLGeneratorAgent(llm=llm)
+    first = agent.generate(_ctx("count orders"))
+    second = agent.generate(_ctx("count orders"))
+    assert first == second == {"candidates": ["SELECT 1;", "SELECT 2;"]}
+    assert len(llm.prompts) == 1
+    agent.generate(_ctx("list orders"))
+    assert len(llm.prompts) == 2
+
+
+def test_generator_cache_is_bounded():
+    """
+    Ensure the least recently used prompt is evicted once the cache is full.
+    """
+    llm = CountingLLMClient("SELECT 1;")
+    agent = SQLGeneratorAgent(llm=llm, cache_size=1)
+    agent.generate(_ctx("a"))
+    agent.generate(_ctx("b"))
+    agent.generate(_ctx("a"))
+    assert len(llm.prompts) == 3
@@ -0,0 +1,62 @@
+"""
+Tests for ContextStore persistence.
+"""
+
+import json
+from decimal import Decimal
+
+import pytest
+
+from src.api.models import QueryRequest
+from src.core.context import QueryContext
+from src.infra import storage
+from src.infra.storage import ContextStore
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_context_store_round_trips_context(tmp_path, monkeypatch, use_orjson):
+    """
+    Ensure saved contexts are valid UTF-8 JSON with or without orjson, including warehouse values.
+    """
+    if not use_orjson:
+        monkeypatch.setattr(storage, "orjson", None)
+    elif storage.orjson is None:
+        pytest.skip("orjson not installed")
+    ctx = QueryContext.from_request(QueryRequest(user_id="u", session_id="s", query_text="美国客户"))
+    ctx.execution_state = {"sample_rows": [{"amount": Decimal("1.50")}]}
+    path = ContextStore(base_dir=str(tmp_path)).save(ctx)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["query_id"] == ctx.query_id
+    assert data["user_query"] == "美国客户"
+    assert data["execution_state"]["sample_rows"] == [{"amount": "1.50"}]
+
+
+def test_context_store_leaves_no_temp_files(tmp_path):
+    """
+    Ensure saving replaces the target atomically without leaving temp files behind.
+    """
+    store = ContextStore(base_dir=str(tmp_path), fsync=True)
+    ctx = QueryContext.from_request(QueryRequest(user_id="u", session_id="s", query_text="q"))
+    store.save(ctx)
+    ctx.final_decision = {"status": "ok"}
+    path = store.save(ctx)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"{ctx.query_id}.json"]
+    with open(path, "r", encoding="utf-8") as f:
+        assert json.load(f)["final_decision"] == {"status": "ok"}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_context_store_saves_wide_integers(tmp_path, monkeypatch, use_orjson):
+    """
+    Ensure integers wider than 64 bits (NUMBER(38,0) ids) are saved exactly, falling back from orjson.
+    """
+    if not use_orjson:
+        monkeypatch.setattr(storage, "orjson", None)
+    elif storage.orjson is None:
+        pytest.skip("orjson not installed")
+    ctx = QueryContext.from_request(QueryRequest(user_id="u", session_id="s", query_text="q"))
+    ctx.execution_state = {"sample_rows": [{"ID": 12345678901234567890123}]}
+    path = ContextStore(base_dir=str(tmp_path)).save(ctx)
+    with open(path, "r", encoding="utf-8") as f:
+        assert json.load(f)["execution_state"]["sample_rows"] == [{"ID": 12345678901234567890123}]